@@ -132,6 +132,21 @@ doc_events = {
     },
     "Assistant Core Settings": {"on_update": "frappe_assistant_core.utils.cache.invalidate_settings_cache"},
     "Assistant Audit Log": {"after_insert": "frappe_assistant_core.utils.cache.invalidate_dashboard_cache"},
+    "Fiscal Year": {
+        "on_update": "frappe_assistant_core.plugins.core.tools.report_tools.clear_fiscal_year_cache",
+        "on_trash": "frappe_assistant_core.plugins.core.tools.report_tools.clear_fiscal_year_cache",
+    },
+    "Prepared Report": {
+        "on_update": "frappe_assistant_core.plugins.core.tools.report_tools.notify_prepared_report_status"
+    },
+    "User": {
+        "on_update": "frappe_assistant_core.plugins.core.tools.send_email.clear_recipient_directory",
+        "on_trash": "frappe_assistant_core.plugins.core.tools.send_email.clear_recipient_directory",
+    },
+    "Contact": {
+        "on_update": "frappe_assistant_core.plugins.core.tools.send_email.clear_recipient_directory",
+        "on_trash": "frappe_assistant_core.plugins.core.tools.send_email.clear_recipient_directory",
+    },
 }
 
 # Scheduled Tasks
@@ -255,11 +270,17 @@ after_migrate = [
     "frappe_assistant_core.utils.migration_hooks.after_migrate",
 ]
 
+# Clear in-process report caches along with frappe.clear_cache()
+clear_cache = "frappe_assistant_core.plugins.core.tools.report_tools.clear_report_js_cache"
+
 # Fixtures
 # --------
 
 fixtures = [
-    {"doctype": "Custom Field", "filters": {"dt": "User", "fieldname": ["in", ["assistant_enabled"]]}},
+    {
+        "doctype": "Custom Field",
+        "filters": {"name": ["in", ["User-assistant_enabled", "Report-result_cache_ttl"]]},
+    },
     {"doctype": "Role", "filters": {"role_name": ["in", ["Assistant User", "Assistant Admin"]]}},
     # System prompt templates - these are installed via after_migrate hook
     # because they require special handling for child table data (arguments)
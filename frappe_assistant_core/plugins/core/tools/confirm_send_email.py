@@ -67,10 +67,15 @@ Tool: {"communication_id": "xyz123", "preview": "...", "awaiting_confirmation":
 Agent: "Voici l'aperçu:\n[preview]\n\nVoulez-vous l'envoyer?"
 User: "oui"
 Agent: confirm_send_email(communication_id="xyz123")  ← AUTOMATIQUE! IMMÉDIAT!
-Tool: {"success": true, "sent": true}
-Agent: "✅ Email envoyé avec succès!"
+Tool: {"success": true, "queued": true}
+Agent: "✅ Email mis en file d'envoi, il part dans quelques instants."
 ```
 
+📬 ENVOI EN ARRIÈRE-PLAN:
+L'email est envoyé par un worker après la réponse du tool: "queued": true ne garantit pas
+la livraison. Si un envoi précédent a échoué, le tool le signale (previous_delivery_failed)
+et remet l'email en file d'envoi.
+
 ❌ EXEMPLE INCORRECT:
 ```
 User: "oui"
@@ -159,57 +164,41 @@ Anglais: yes, yeah, okay, send, confirm, go ahead, sure"""
 
 				comm.save()
 
-			# Get attachments from Communication if any
-			attachments_list = []
-			if comm.has_attachment:
-				frappe.logger("confirm_send_email").info(
-					f"📎 Loading attachments for Communication {comm.name}"
-				)
-				attached_files = frappe.get_all(
-					"File",
-					filters={
-						"attached_to_doctype": "Communication",
-						"attached_to_name": comm.name
-					},
-					fields=["name", "file_name"]
-				)
-				# Format attachments as dicts with 'fid' key (required by frappe.sendmail)
-				attachments_list = [{"fid": f.name} for f in attached_files]
-				frappe.logger("confirm_send_email").info(
-					f"📎 Found {len(attachments_list)} attachment(s): {[f['file_name'] for f in attached_files]}"
-				)
-
-			# Send the email
-			frappe.sendmail(
-				recipients=comm.recipients,
-				cc=comm.cc if comm.cc else None,
-				bcc=comm.bcc if comm.bcc else None,
-				subject=comm.subject,
-				message=comm.content,
-				attachments=attachments_list if attachments_list else None,
-				reference_doctype="Communication",
-				reference_name=comm.name,
-				now=True
+			# The worker records a failed send as delivery_status "Error"; report it on retry
+			previous_delivery_failed = comm.delivery_status == "Error"
+			if previous_delivery_failed:
+				frappe.db.set_value("Communication", comm.name, "delivery_status", "", update_modified=False)
+
+			# Send from a background worker once the modifications above are committed
+			frappe.enqueue(
+				"frappe_assistant_core.plugins.core.tools.send_email.deliver_communication",
+				queue="short",
+				enqueue_after_commit=True,
+				communication_id=comm.name,
+				mark_sent=True
 			)
 
-			# Update communication status
-			comm.email_status = "Sent"
-			comm.delivery_status = "Sent"
-			comm.status = "Linked"
-			comm.db_update()
-			frappe.db.commit()
-
-			return {
+			result = {
 				"success": True,
 				"communication_id": comm.name,
-				"sent": True,
+				"sent": False,
+				"queued": True,
 				"recipient": comm.recipients,
 				"cc": comm.cc if comm.cc else None,
 				"subject": comm.subject,
-				"message": f"✅ Email sent successfully to {comm.recipients}",
-				"sent_at": str(frappe.utils.now())
+				"message": f"✅ Email queued for sending to {comm.recipients}",
+				"queued_at": str(frappe.utils.now())
 			}
 
+			if previous_delivery_failed:
+				result.update({
+					"previous_delivery_failed": True,
+					"guidance": "The previous attempt to send this email failed and it has been queued again.",
+					"suggestion": "If it fails again, check the Error Log and the email account (SMTP) settings"
+				})
+
+			return result
+
 		except Exception as e:
 			frappe.log_error(
 				title=_("Confirm Send Email Error"),
@@ -217,6 +206,7 @@ Anglais: yes, yeah, okay, send, confirm, go ahead, sure"""
 			)
 
 			error_msg = str(e)
+			error_lower = error_msg.lower()
 
 			# Provide specific guidance based on error type
 			result = {
@@ -225,19 +215,19 @@ Anglais: yes, yeah, okay, send, confirm, go ahead, sure"""
 				"error": error_msg
 			}
 
-			if "smtp" in error_msg.lower() or "mail" in error_msg.lower():
+			if "smtp" in error_lower or "mail" in error_lower:
 				result.update({
 					"error_type": "smtp_configuration_error",
 					"guidance": "Email server (SMTP) not configured properly.",
 					"suggestion": "Contact system administrator to configure email settings in Frappe"
 				})
-			elif "permission" in error_msg.lower():
+			elif "permission" in error_lower:
 				result.update({
 					"error_type": "permission_error",
 					"guidance": "Insufficient permissions to send emails.",
 					"suggestion": "Contact system administrator to grant email sending permissions"
 				})
-			elif "recipient" in error_msg.lower() or "email" in error_msg.lower():
+			elif "recipient" in error_lower or "email" in error_lower:
 				result.update({
 					"error_type": "recipient_error",
 					"guidance": "Invalid recipient email address.",
@@ -63,8 +63,8 @@ You: "✏️ Email modifié.\n[nouveau preview]\nVoulez-vous l'envoyer maintenan
 
 User: "oui envoie"
 You → call confirm_send_email(communication_id="abc123")
-Tool: {"success": true, "sent": true}
-You: "✅ Email envoyé avec succès!"
+Tool: {"success": true, "queued": true}
+You: "✅ Email mis en file d'envoi, il part dans quelques instants."
 
 📋 PARAMÈTRES:
   • communication_id (required): L'ID du draft à modifier
@@ -187,20 +187,21 @@ You: "✅ Email envoyé avec succès!"
 
 	def _generate_preview(self, recipient: str, subject: str, content: str, cc: list, bcc: list, sender: str) -> str:
 		"""Generate markdown preview of email"""
-		preview = f"📧 **Aperçu de l'email (modifié)**\n\n"
-		preview += f"**De:** {sender}\n"
-		preview += f"**À:** {recipient}\n"
+		parts = [
+			"📧 **Aperçu de l'email (modifié)**\n\n",
+			f"**De:** {sender}\n",
+			f"**À:** {recipient}\n"
+		]
 
 		if cc:
-			preview += f"**CC:** {', '.join(cc)}\n"
+			parts.append(f"**CC:** {', '.join(cc)}\n")
 		if bcc:
-			preview += f"**BCC:** {', '.join(bcc)}\n"
+			parts.append(f"**BCC:** {', '.join(bcc)}\n")
 
-		preview += f"**Objet:** {subject}\n\n"
-		preview += f"**Message:**\n\n"
+		parts.append(f"**Objet:** {subject}\n\n")
+		parts.append("**Message:**\n\n")
 
 		# Quote the message content
-		for line in content.split("\n"):
-			preview += f"> {line}\n"
+		parts.extend(f"> {line}\n" for line in content.split("\n"))
 
-		return preview
+		return "".join(parts)
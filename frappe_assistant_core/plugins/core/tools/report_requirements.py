@@ -89,7 +89,7 @@ class ReportRequirements(BaseTool):
                 return column_result
 
             # Get report document for prepared report info
-            report_doc = frappe.get_doc("Report", report_name)
+            report_doc = frappe.get_cached_doc("Report", report_name)
 
             # Start building comprehensive response
             result = {
@@ -126,25 +126,26 @@ class ReportRequirements(BaseTool):
                 if "filter_guidance" in column_result:
                     result["filter_guidance"] = column_result["filter_guidance"]
 
-                # Add filter requirements analysis
-                result["filter_requirements"] = self._analyze_filter_requirements(
-                    report_name, column_result.get("report_type")
-                )
-
-                # For Script Reports, try to parse filters from JS file and add to main response
+                # For Script Reports, try to parse filters from JS file first
+                parsed_filters = None
                 if column_result.get("report_type") == "Script Report":
                     module_name = report_doc.module
                     parsed_filters = self._parse_script_report_filters(report_name, module_name)
 
-                    if parsed_filters and parsed_filters.get("filters"):
-                        result["filters_definition"] = parsed_filters["filters"]
-                        result["required_filter_names"] = parsed_filters.get("required_filters", [])
-                        result["optional_filter_names"] = parsed_filters.get("optional_filters", [])
+                if parsed_filters and parsed_filters.get("filters"):
+                    result["filters_definition"] = parsed_filters["filters"]
+                    result["required_filter_names"] = parsed_filters.get("required_filters", [])
+                    result["optional_filter_names"] = parsed_filters.get("optional_filters", [])
 
-                        # Override filter_requirements with parsed data instead of pattern-based guesses
-                        result["filter_requirements"] = self._build_requirements_from_parsed_filters(
-                            parsed_filters
-                        )
+                    # Use parsed data instead of pattern-based guesses
+                    result["filter_requirements"] = self._build_requirements_from_parsed_filters(
+                        parsed_filters
+                    )
+                else:
+                    # Fall back to pattern-based filter requirements analysis
+                    result["filter_requirements"] = self._analyze_filter_requirements(
+                        report_name, column_result.get("report_type")
+                    )
 
             # Add comprehensive metadata if requested
             if include_metadata:
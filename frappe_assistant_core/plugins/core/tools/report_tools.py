@@ -14,11 +14,115 @@
 # You should have received a copy of the GNU Affero General Public License
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
+import functools
+import hashlib
 import json
-from typing import Any, Dict, List
+import os
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
 
 import frappe
 from frappe import _
+from frappe.utils import cint, getdate
+
+# Marker for request-scoped memoized values that have not been looked up yet
+_SENTINEL = object()
+
+# Cache key of the latest enabled Fiscal Year's (start, end) dates, cleared on Fiscal Year changes
+_FISCAL_YEAR_CACHE_KEY = "assistant_latest_fiscal_year"
+
+# Redis hash holding Query Report column definitions, keyed by report name: (modified, columns)
+_COLUMNS_CACHE_NAME = "assistant_report_columns"
+
+# Parsed JavaScript filter defaults, keyed by file path: (file mtime, {fieldname: default})
+_FILTER_DEFAULTS_CACHE: Dict[str, Tuple[float, Dict[str, str]]] = {}
+
+# Tokens of report JavaScript relevant to locating the filters array; string literals and
+# comments are matched (and skipped) so brackets inside them do not affect nesting
+_JS_TOKEN_RE = re.compile(
+    r"""(?P<filters_key>\bfilters\s*:|(["'])filters\2\s*:)"""
+    r"""|'(?:\\.|[^'\\\n])*'|"(?:\\.|[^"\\\n])*"|`(?:\\.|[^`\\])*`"""
+    r"|//[^\n]*|/\*.*?\*/|(?P<bracket>[\[\]{}])",
+    re.DOTALL,
+)
+
+# Quoted fieldname/default properties of a JavaScript filter object
+_FILTER_ATTRS_RE = re.compile(r'["\']?(fieldname|default)["\']?:\s*["\'`]([^"\'`]+)["\'`]')
+
+# Report-specific default parameters, keyed by a substring of the lowercased report name
+_REPORT_DEFAULTS = (
+    ("sales analytics", {"value_quantity": "Value"}),
+    ("quotation trends", {"based_on": "Item"}),
+)
+
+# Filter guidance returned by get_report_columns, keyed by a substring of the lowercased report name
+_FILTER_GUIDANCE = {
+    "sales_analytics": (
+        "Required: 'doc_type' (Sales Invoice, Sales Order, Quotation, etc.)",
+        "Required: 'tree_type' (Customer, Item, Territory, etc.)",
+        "Optional: 'from_date' and 'to_date' (defaults to last 12 months)",
+        "Optional: 'company' (uses default company if not specified)",
+    ),
+}
+
+# Allowed values of common Select filters, and their comma-separated form for error messages
+_SELECT_OPTIONS = {
+    "tree_type": [
+        "Customer",
+        "Supplier",
+        "Item",
+        "Customer Group",
+        "Supplier Group",
+        "Item Group",
+        "Territory",
+        "Order Type",
+        "Project",
+    ],
+    "doc_type": [
+        "Sales Invoice",
+        "Sales Order",
+        "Quotation",
+        "Purchase Invoice",
+        "Purchase Order",
+        "Purchase Receipt",
+        "Delivery Note",
+    ],
+    "value_quantity": ["Value", "Quantity"],
+    "range": ["Weekly", "Monthly", "Quarterly", "Half-Yearly", "Yearly"],
+}
+_SELECT_VALIDATIONS = {key: frozenset(options) for key, options in _SELECT_OPTIONS.items()}
+_SELECT_DISPLAY = {key: ", ".join(options) for key, options in _SELECT_OPTIONS.items()}
+
+_SCRIPT_REPORT_GUIDANCE = "Script Reports often have mandatory filters - use report_requirements tool to discover exact filter definitions"
+
+
+@dataclass(frozen=True)
+class ReportMeta:
+    """Report attributes used during execution, read once from the Report document"""
+
+    name: str
+    report_type: str
+    module: str
+    is_tree: int
+    parent_field: Optional[str]
+    prepared: bool
+    timeout: int
+
+    @classmethod
+    def from_doc(cls, report_doc) -> "ReportMeta":
+        return cls(
+            name=report_doc.name,
+            report_type=report_doc.report_type,
+            module=report_doc.module,
+            is_tree=getattr(report_doc, "is_tree", 0),
+            parent_field=getattr(report_doc, "parent_field", None),
+            prepared=bool(
+                getattr(report_doc, "prepared_report", False)
+                and not getattr(report_doc, "disable_prepared_report", False)
+            ),
+            timeout=cint(getattr(report_doc, "timeout", 0)),
+        )
 
 
 class ReportTools:
@@ -43,19 +147,32 @@ class ReportTools:
     ) -> Dict[str, Any]:
         """Execute a Frappe report"""
         try:
-            # Check if report exists
-            if not frappe.db.exists("Report", report_name):
+            # Get report document (cached - Report definitions rarely change)
+            try:
+                report_doc = frappe.get_cached_doc("Report", report_name)
+            except frappe.DoesNotExistError:
                 return {"success": False, "error": f"Report '{report_name}' not found"}
 
             # Check permissions
-            if not frappe.has_permission("Report", "read", report_name):
+            if not frappe.has_permission("Report", "read", report_doc):
                 return {"success": False, "error": f"No permission to access report '{report_name}'"}
 
-            # Get report document
-            report_doc = frappe.get_doc("Report", report_name)
+            # Read the attributes needed downstream once, instead of repeatedly from the document
+            report_meta = ReportMeta.from_doc(report_doc)
+
+            # Normalize filters once; every later step works on the canonical dict
+            filters = ReportTools._canonicalize_filters(filters)
+
+            # Serve recent results from cache when the report opts in via result_cache_ttl
+            cache_ttl = cint(getattr(report_doc, "result_cache_ttl", 0))
+            if cache_ttl > 0:
+                cache_key = ReportTools._get_result_cache_key(report_name, filters)
+                cached_result = frappe.cache.get_value(cache_key)
+                if cached_result is not None:
+                    return cached_result
 
             # Validate filters before execution
-            validation_result = ReportTools._validate_filters(filters or {}, report_doc)
+            validation_result = ReportTools._validate_filters(filters, report_meta)
             if not validation_result.get("valid"):
                 return {
                     "success": False,
@@ -65,60 +182,72 @@ class ReportTools:
                 }
 
             # Execute report based on type
-            if report_doc.report_type == "Query Report":
-                result = ReportTools._execute_query_report(report_doc, filters or {})
-            elif report_doc.report_type == "Script Report":
-                result = ReportTools._execute_script_report(report_doc, filters or {})
-            elif report_doc.report_type == "Report Builder":
-                return {
-                    "success": False,
-                    "error": "Report Builder reports are not supported. Report Builder creates simple filtered views of DocTypes. For business intelligence and analytics, please use Script Reports, Query Reports, or Custom Reports instead.",
-                }
-            else:
-                return {"success": False, "error": f"Unsupported report type: {report_doc.report_type}"}
+            handler = ReportTools._EXEC_DISPATCH.get(report_meta.report_type)
+            if handler is None:
+                if report_meta.report_type == "Report Builder":
+                    return {
+                        "success": False,
+                        "error": "Report Builder reports are not supported. Report Builder creates simple filtered views of DocTypes. For business intelligence and analytics, please use Script Reports, Query Reports, or Custom Reports instead.",
+                    }
+                return {"success": False, "error": f"Unsupported report type: {report_meta.report_type}"}
+
+            result = handler(report_meta, filters)
 
             # Add debug information for troubleshooting
             # Handle different result structures
             if isinstance(result, dict):
                 # Script/Query reports return {'result': [...], 'columns': [...]}
-                raw_data = result.get("result", [])
+                raw_data = result.get("result") or []
                 columns = result.get("columns", [])
 
-                # Convert frappe._dict objects to plain Python dicts for pandas compatibility
-                # This prevents "invalid __array_struct__" errors when using with pandas
-                data = [dict(row) if isinstance(row, dict) else row for row in raw_data]
-
                 debug_info = {
                     "success": True,
                     "report_name": report_name,
-                    "report_type": report_doc.report_type,
-                    "data": data,
+                    "report_type": report_meta.report_type,
                     "columns": columns,
                     "message": result.get("message"),
-                    "filters_applied": filters or {},
+                    "filters_applied": filters,
                     "auto_filters_added": "Automatic date range and company filters applied if missing",
-                    "raw_result_keys": list(result.keys()) if result else [],
-                    "data_count": len(data) if data else 0,
-                    "result_type": type(result).__name__ if result else "None",
+                    # Convert frappe._dict objects to plain Python dicts for pandas compatibility
+                    # This prevents "invalid __array_struct__" errors when using with pandas
+                    "data": [dict(row) if isinstance(row, dict) else row for row in raw_data],
+                    "data_count": len(raw_data) if raw_data else 0,
                 }
             else:
                 return {"success": False, "error": f"Unexpected result type: {type(result).__name__}"}
 
             # Add debug info if no data found
-            data = debug_info.get("data", [])
-            if not data or len(data) == 0:
+            if not raw_data:
                 debug_info["debug_info"] = {
                     "filters_used": filters,
-                    "result_structure": result,
-                    "error_from_result": result.get("error") if isinstance(result, dict) else None,
+                    "result_type": type(result).__name__,
+                    # Only lightweight keys - the raw result can be large and is already summarized above
+                    "result_structure": {
+                        "keys": list(result.keys()),
+                        "message": result.get("message"),
+                        "error": result.get("error"),
+                    },
+                    "error_from_result": result.get("error"),
                 }
 
+            # Cache completed results only - errors and prepared report timeouts must be retried
+            if cache_ttl > 0 and not result.get("error") and result.get("status") != "timeout":
+                frappe.cache.set_value(cache_key, debug_info, expires_in_sec=cache_ttl)
+
             return debug_info
 
         except Exception as e:
             frappe.log_error(f"assistant Execute Report Error: {str(e)}")
             return {"success": False, "error": str(e)}
 
+    @staticmethod
+    def _get_result_cache_key(report_name: str, filters: Dict[str, Any]) -> str:
+        """Build a result cache key from the report, current user and a hash of the filters"""
+        filters_hash = hashlib.blake2b(
+            json.dumps(filters, sort_keys=True, default=str).encode(), digest_size=16
+        ).hexdigest()
+        return f"assistant_report_result:{report_name}:{frappe.session.user}:{filters_hash}"
+
     @staticmethod
     def list_reports(module: str = None, report_type: str = None) -> Dict[str, Any]:
         """Get list of available reports"""
@@ -129,19 +258,15 @@ class ReportTools:
             if report_type:
                 filters["report_type"] = report_type
 
-            reports = frappe.get_all(
+            # get_list applies read permissions in the query itself
+            accessible_reports = frappe.get_list(
                 "Report",
                 filters=filters,
                 fields=["name", "report_name", "report_type", "module", "is_standard", "disabled"],
                 order_by="report_name",
+                limit_page_length=0,
             )
 
-            # Filter by permissions
-            accessible_reports = []
-            for report in reports:
-                if frappe.has_permission("Report", "read", report.name):
-                    accessible_reports.append(report)
-
             return {
                 "success": True,
                 "reports": accessible_reports,
@@ -157,32 +282,28 @@ class ReportTools:
     def get_report_columns(report_name: str) -> Dict[str, Any]:
         """Get column information for a report"""
         try:
-            if not frappe.db.exists("Report", report_name):
+            try:
+                report_doc = frappe.get_cached_doc("Report", report_name)
+            except frappe.DoesNotExistError:
                 return {"success": False, "error": f"Report '{report_name}' not found"}
 
-            if not frappe.has_permission("Report", "read", report_name):
+            if not frappe.has_permission("Report", "read", report_doc):
                 return {"success": False, "error": f"No permission to access report '{report_name}'"}
 
-            report_doc = frappe.get_doc("Report", report_name)
             columns = []
 
             if report_doc.report_type == "Query Report":
-                # Try to get columns from query execution with minimal filters
-                try:
-                    # Try with empty filters first
-                    result = ReportTools._execute_query_report(report_doc, {}, get_columns_only=True)
-                    columns = result.get("columns", [])
-                except Exception as e:
-                    # If that fails, try with default company
-                    try:
-                        default_company = frappe.db.get_single_value("Global Defaults", "default_company")
-                        if default_company:
-                            result = ReportTools._execute_query_report(
-                                report_doc, {"company": default_company}, get_columns_only=True
-                            )
-                            columns = result.get("columns", [])
-                    except Exception:
-                        frappe.log_error(f"Error getting columns from query report: {str(e)}")
+                # Column definitions only change when the Report is modified; one field per report,
+                # overwritten on edit, so the hash does not grow with every modification
+                modified = str(report_doc.modified)
+                cached = frappe.cache.hget(_COLUMNS_CACHE_NAME, report_name)
+                columns = cached[1] if cached and cached[0] == modified else None
+
+                if columns is None:
+                    columns = ReportTools._extract_query_report_columns(ReportMeta.from_doc(report_doc))
+                    if columns:
+                        frappe.cache.hset(_COLUMNS_CACHE_NAME, report_name, (modified, columns))
+                    elif columns is None:
                         # Return basic info if column extraction fails
                         columns = [
                             {
@@ -194,15 +315,14 @@ class ReportTools:
 
             # Add helpful filter guidance based on report name patterns
             filter_guidance = []
-            if "sales_analytics" in report_name.lower():
-                filter_guidance.append("Required: 'doc_type' (Sales Invoice, Sales Order, Quotation, etc.)")
-                filter_guidance.append("Required: 'tree_type' (Customer, Item, Territory, etc.)")
-                filter_guidance.append("Optional: 'from_date' and 'to_date' (defaults to last 12 months)")
-                filter_guidance.append("Optional: 'company' (uses default company if not specified)")
-            elif report_doc.report_type == "Script Report":
-                filter_guidance.append(
-                    "Script Reports often have mandatory filters - use report_requirements tool to discover exact filter definitions"
-                )
+            report_name_lower = report_name.lower()
+            for pattern, guidance in _FILTER_GUIDANCE.items():
+                if pattern in report_name_lower:
+                    filter_guidance.extend(guidance)
+                    break
+            else:
+                if report_doc.report_type == "Script Report":
+                    filter_guidance.append(_SCRIPT_REPORT_GUIDANCE)
 
             result = {
                 "success": True,
@@ -221,7 +341,56 @@ class ReportTools:
             return {"success": False, "error": str(e)}
 
     @staticmethod
-    def _handle_prepared_report_execution(report_doc, filters):
+    def _get_default_company():
+        """Get the default company, memoized for the current request"""
+        default_company = getattr(frappe.local, "_fac_default_company", _SENTINEL)
+        if default_company is _SENTINEL:
+            default_company = frappe.db.get_single_value("Global Defaults", "default_company")
+            frappe.local._fac_default_company = default_company
+        return default_company
+
+    @staticmethod
+    def _get_latest_fiscal_year():
+        """
+        Get the latest enabled fiscal year as a (start, end) tuple, or None.
+
+        Memoized for the current request and cached in Redis until a Fiscal Year is
+        saved or deleted (see clear_fiscal_year_cache). Sites without any fiscal year
+        are not cached, so one created later is picked up by the next report.
+        """
+        fiscal_year = getattr(frappe.local, "_fac_latest_fiscal_year", _SENTINEL)
+        if fiscal_year is _SENTINEL:
+            fiscal_year = frappe.cache.get_value(_FISCAL_YEAR_CACHE_KEY)
+            if fiscal_year is None:
+                fiscal_year = frappe.db.get_value(
+                    "Fiscal Year",
+                    {"disabled": 0},
+                    ["year_start_date", "year_end_date"],
+                    order_by="year_start_date desc",
+                )
+                if fiscal_year:
+                    fiscal_year = tuple(fiscal_year)
+                    frappe.cache.set_value(_FISCAL_YEAR_CACHE_KEY, fiscal_year)
+
+            frappe.local._fac_latest_fiscal_year = fiscal_year or None
+        return frappe.local._fac_latest_fiscal_year
+
+    @staticmethod
+    def _extract_query_report_columns(report_meta):
+        """Run a Query Report with minimal filters to read its columns, or return None if it cannot run"""
+        # Most Query Reports need a company, so probe with the default one in a single attempt
+        default_company = ReportTools._get_default_company()
+        probe_filters = {"company": default_company} if default_company else {}
+
+        try:
+            result = ReportTools._execute_query_report(report_meta, probe_filters, get_columns_only=True)
+            return result.get("columns", [])
+        except Exception as e:
+            frappe.logger("report_tools").debug(f"Error getting columns from query report: {str(e)}")
+            return None
+
+    @staticmethod
+    def _handle_prepared_report_execution(report_meta, filters):
         """
         Smart handler for prepared reports with polling support for AI/MCP tools:
         1. Check for existing completed prepared report
@@ -237,10 +406,13 @@ class ReportTools:
         )
         from frappe.desk.query_report import get_prepared_report_result, run
 
+        # Frappe's prepared report API needs the Report document itself
+        report_doc = frappe.get_cached_doc("Report", report_meta.name)
+
         try:
             # Check if a completed prepared report exists with these filters
             prepared_report_name = get_completed_prepared_report(
-                filters=filters, user=frappe.session.user, report_name=report_doc.name
+                filters=filters, user=frappe.session.user, report_name=report_meta.name
             )
 
             if prepared_report_name:
@@ -262,13 +434,13 @@ class ReportTools:
                     }
 
             # Get report timeout configuration
-            report_timeout = frappe.get_value("Report", report_doc.name, "timeout") or 120
+            report_timeout = report_meta.timeout or 120
 
             # Try quick direct execution for fast reports
             if report_timeout < 60:
                 try:
                     direct_result = run(
-                        report_name=report_doc.name,
+                        report_name=report_meta.name,
                         filters=filters,
                         user=frappe.session.user,
                         ignore_prepared_report=True,  # Force direct execution
@@ -285,15 +457,17 @@ class ReportTools:
                         }
                 except Exception as e:
                     # Quick execution failed, fall through to background job
-                    frappe.log_error(f"Quick execution failed for {report_doc.name}: {str(e)}")
+                    frappe.logger("report_tools").debug(
+                        f"Quick execution failed for {report_meta.name}: {str(e)}"
+                    )
 
             # ===== Queue and WAIT for completion with polling =====
 
             # Queue the background job
-            prepared_report = make_prepared_report(report_name=report_doc.name, filters=filters)
+            prepared_report = make_prepared_report(report_name=report_meta.name, filters=filters)
             prepared_report_name = prepared_report.get("name")
 
-            # Poll for completion with exponential backoff
+            # Wait for the completion signal, re-checking status with exponential backoff
             max_wait_time = min(report_timeout, 300)  # Cap at 5 minutes for MCP tools
             poll_interval = 2.0  # Start with 2 seconds
             max_poll_interval = 15.0  # Max 15 seconds between polls
@@ -302,12 +476,17 @@ class ReportTools:
             frappe.db.commit()  # Ensure job is committed to DB
 
             while elapsed_time < max_wait_time:
-                time.sleep(poll_interval)
-                elapsed_time += poll_interval
+                wait_started = time.monotonic()
+                ReportTools._wait_for_prepared_report(prepared_report_name, poll_interval)
+                elapsed_time += time.monotonic() - wait_started
 
                 # Check prepared report status - get fresh data
                 frappe.db.rollback()
-                prepared_doc = frappe.get_doc("Prepared Report", prepared_report_name)
+                prepared_doc = frappe.db.get_value(
+                    "Prepared Report", prepared_report_name, ["status", "error_message"], as_dict=True
+                )
+                if not prepared_doc:
+                    break
 
                 if prepared_doc.status == "Completed":
                     # Report is ready! Retrieve and return data
@@ -349,110 +528,136 @@ class ReportTools:
                 "prepared_report": True,
                 "prepared_report_name": prepared_report_name,
                 "message": f"Report generation is taking longer than expected ({int(max_wait_time)}s timeout reached). The report is still being generated in the background. You can retry with the same filters in a few minutes to retrieve the cached result.",
-                "retry_guidance": f"Use report_name='{report_doc.name}' with the same filters to retrieve results.",
+                "retry_guidance": f"Use report_name='{report_meta.name}' with the same filters to retrieve results.",
                 "wait_time_seconds": int(elapsed_time),
             }
 
         except Exception as e:
-            frappe.log_error(f"Prepared report handling error for {report_doc.name}: {str(e)}")
+            frappe.log_error(f"Prepared report handling error for {report_meta.name}: {str(e)}")
             raise e
 
     @staticmethod
-    def _execute_query_report(report_doc, filters, get_columns_only=False):
-        """Execute a Query Report"""
-        from frappe.desk.query_report import run
-
-        # Check if this is a prepared report
-        if getattr(report_doc, "prepared_report", False) and not getattr(
-            report_doc, "disable_prepared_report", False
-        ):
-            return ReportTools._handle_prepared_report_execution(report_doc, filters)
-
-        try:
-            # Add default filters for common requirements and clean None values
-            if not filters:
-                filters = {}
-
-            # Clean any None values from filters that could cause startswith errors
-            cleaned_filters = {}
-            for key, value in filters.items():
-                if value is not None:
-                    cleaned_filters[key] = value
-            filters = cleaned_filters
-
-            # Add default date filters if missing - use current fiscal year dates
-            if not filters.get("from_date") and not filters.get("to_date"):
-                try:
-                    # Get current fiscal year
-                    fiscal_year = frappe.db.get_value(
-                        "Fiscal Year",
-                        {"disabled": 0},
-                        ["year_start_date", "year_end_date"],
-                        order_by="year_start_date desc",
-                    )
+    def _prepare_filters(report_meta, filters):
+        """
+        Apply defaults shared by Query and Script Reports: fiscal year dates, default
+        company, report-specific parameters and JavaScript filter defaults.
 
-                    if fiscal_year:
-                        filters["from_date"] = str(fiscal_year[0])  # Fiscal year start
-                        filters["to_date"] = str(fiscal_year[1])  # Fiscal year end
-                    else:
-                        # Fallback to last 12 months if no fiscal year found
-                        from frappe.utils import add_months, getdate
-
-                        today = getdate()
-                        filters["to_date"] = str(today)
-                        filters["from_date"] = str(add_months(today, -12))
-                except Exception:
-                    # Fallback to last 12 months on any error
+        Expects filters canonicalized by _canonicalize_filters; all defaults added here
+        are already plain strings. Returns a new dict.
+        """
+        filters = dict(filters) if isinstance(filters, dict) else {}
+
+        # Add default date filters if missing - use current fiscal year dates
+        if not filters.get("from_date") and not filters.get("to_date"):
+            try:
+                # Get current fiscal year
+                fiscal_year = ReportTools._get_latest_fiscal_year()
+
+                if fiscal_year:
+                    filters["from_date"] = str(fiscal_year[0])  # Fiscal year start
+                    filters["to_date"] = str(fiscal_year[1])  # Fiscal year end
+                else:
+                    # Fallback to last 12 months if no fiscal year found
                     from frappe.utils import add_months, getdate
 
                     today = getdate()
                     filters["to_date"] = str(today)
                     filters["from_date"] = str(add_months(today, -12))
-            elif not filters.get("to_date") and filters.get("from_date"):
-                from frappe.utils import getdate
-
-                filters["to_date"] = str(getdate())
-            elif not filters.get("from_date") and filters.get("to_date"):
+            except Exception:
+                # Fallback to last 12 months on any error
                 from frappe.utils import add_months, getdate
 
-                filters["from_date"] = str(add_months(getdate(filters["to_date"]), -12))
-
-            # Add company filter if required and not provided
-            if "company" not in filters and frappe.db.exists("Company"):
-                default_company = frappe.db.get_single_value("Global Defaults", "default_company")
-                if default_company:
-                    filters["company"] = str(default_company)
-
-            # Add report-specific default parameters
-            report_name_lower = report_doc.name.lower()
-
-            # Sales Analytics defaults
-            if "sales analytics" in report_name_lower and "value_quantity" not in filters:
-                filters["value_quantity"] = "Value"
-
-            # Quotation Trends defaults
-            if "quotation trends" in report_name_lower and "based_on" not in filters:
-                filters["based_on"] = "Item"
-
-            # Final cleanup - ensure all filter values are strings or proper types
-            final_filters = {}
-            for key, value in filters.items():
-                if value is not None:
-                    # Convert dates to strings if they're not already
-                    if hasattr(value, "strftime"):  # datetime object
-                        final_filters[key] = value.strftime("%Y-%m-%d")
-                    elif isinstance(value, (str, int, float, bool)):
-                        final_filters[key] = value
-                    else:
-                        final_filters[key] = str(value)
-            filters = final_filters
+                today = getdate()
+                filters["to_date"] = str(today)
+                filters["from_date"] = str(add_months(today, -12))
+        elif not filters.get("to_date") and filters.get("from_date"):
+            from frappe.utils import getdate
+
+            filters["to_date"] = str(getdate())
+        elif not filters.get("from_date") and filters.get("to_date"):
+            from frappe.utils import add_months, getdate
+
+            filters["from_date"] = str(add_months(getdate(filters["to_date"]), -12))
+
+        # Add default company for reports that need it (a default is only set when a Company exists)
+        if not filters.get("company"):
+            default_company = ReportTools._get_default_company()
+            if default_company:
+                filters["company"] = str(default_company)
+
+        # Add report-specific default parameters
+        report_name_lower = report_meta.name.lower()
+        for pattern, defaults in _REPORT_DEFAULTS:
+            if pattern in report_name_lower:
+                for key, value in defaults.items():
+                    filters.setdefault(key, value)
+
+        # Apply default values from JavaScript filter definitions (Script Reports only)
+        return ReportTools._apply_filter_defaults(report_meta, filters)
+
+    @staticmethod
+    def _canonicalize_filters(filters) -> Dict[str, Any]:
+        """
+        Normalize a filter dict in a single pass: drop None values (they cause startswith
+        errors in reports), format dates as YYYY-MM-DD and coerce other non-primitive
+        values to strings. List values (used in group reports) keep their list form.
+        """
+        if not isinstance(filters, dict):
+            return {}
+
+        return {
+            key: ReportTools._canonicalize_filter_value(value)
+            for key, value in filters.items()
+            if value is not None
+        }
+
+    @staticmethod
+    def _canonicalize_filter_value(value):
+        """Coerce a single filter value to a string or primitive type"""
+        if isinstance(value, (str, int, float, bool)):
+            return value
+        if hasattr(value, "strftime"):  # date/datetime object
+            return value.strftime("%Y-%m-%d")
+        if isinstance(value, (list, tuple)):
+            return [ReportTools._canonicalize_filter_value(item) for item in value if item is not None]
+        return str(value)
+
+    @staticmethod
+    def _wait_for_prepared_report(prepared_report_name: str, timeout: float):
+        """
+        Block until the prepared report signals completion or the timeout elapses.
+
+        Completion is pushed to a Redis list by notify_prepared_report_status, so this
+        returns as soon as the background job finishes. Falls back to sleeping if Redis
+        blocking pops are unavailable.
+        """
+        import math
+        import time
+
+        try:
+            signal_key = frappe.cache.make_key(get_prepared_report_signal_key(prepared_report_name))
+            frappe.cache.blpop([signal_key], timeout=max(1, math.ceil(timeout)))
+        except Exception:
+            time.sleep(timeout)
+
+    @staticmethod
+    def _execute_query_report(report_meta, filters, get_columns_only=False):
+        """Execute a Query Report"""
+        from frappe.desk.query_report import run
+
+        try:
+            filters = ReportTools._prepare_filters(report_meta, filters)
+
+            # Check if this is a prepared report (after filter processing so cache lookups match)
+            if report_meta.prepared:
+                return ReportTools._handle_prepared_report_execution(report_meta, filters)
 
             return run(
-                report_name=report_doc.name,
+                report_name=report_meta.name,
                 filters=filters,
                 user=frappe.session.user,
-                is_tree=getattr(report_doc, "is_tree", 0),
-                parent_field=getattr(report_doc, "parent_field", None),
+                is_tree=report_meta.is_tree,
+                parent_field=report_meta.parent_field,
             )
         except Exception as e:
             # If execution fails, try to get just column info
@@ -466,136 +671,77 @@ class ReportTools:
             raise e
 
     @staticmethod
-    def _execute_script_report(report_doc, filters):
+    def _execute_script_report(report_meta, filters):
         """Execute a Script Report"""
         from frappe.desk.query_report import run
 
-        # Check if this is a prepared report
-        if getattr(report_doc, "prepared_report", False) and not getattr(
-            report_doc, "disable_prepared_report", False
-        ):
-            return ReportTools._handle_prepared_report_execution(report_doc, filters)
-
         try:
-            # Ensure filters is a proper dict and clean None values
-            if not isinstance(filters, dict):
-                filters = {}
-
-            # Clean any None values from filters that could cause startswith errors
-            cleaned_filters = {}
-            for key, value in filters.items():
-                if value is not None:
-                    cleaned_filters[key] = value
-            filters = cleaned_filters
-
-            # Add default date filters if missing - use current fiscal year dates
-            if not filters.get("from_date") and not filters.get("to_date"):
-                try:
-                    # Get current fiscal year
-                    fiscal_year = frappe.db.get_value(
-                        "Fiscal Year",
-                        {"disabled": 0},
-                        ["year_start_date", "year_end_date"],
-                        order_by="year_start_date desc",
-                    )
+            filters = ReportTools._prepare_filters(report_meta, filters)
 
-                    if fiscal_year:
-                        filters["from_date"] = str(fiscal_year[0])  # Fiscal year start
-                        filters["to_date"] = str(fiscal_year[1])  # Fiscal year end
-                    else:
-                        # Fallback to last 12 months if no fiscal year found
-                        from frappe.utils import add_months, getdate
-
-                        today = getdate()
-                        filters["to_date"] = str(today)
-                        filters["from_date"] = str(add_months(today, -12))
-                except Exception:
-                    # Fallback to last 12 months on any error
-                    from frappe.utils import add_months, getdate
+            # Check if this is a prepared report (after filter processing so cache lookups match)
+            if report_meta.prepared:
+                return ReportTools._handle_prepared_report_execution(report_meta, filters)
 
-                    today = getdate()
-                    filters["to_date"] = str(today)
-                    filters["from_date"] = str(add_months(today, -12))
-            elif not filters.get("to_date") and filters.get("from_date"):
-                from frappe.utils import getdate
-
-                filters["to_date"] = str(getdate())
-            elif not filters.get("from_date") and filters.get("to_date"):
-                from frappe.utils import add_months, getdate
-
-                filters["from_date"] = str(add_months(getdate(filters["to_date"]), -12))
-
-            # For Accounts Receivable Summary, ensure company is set
-            if report_doc.name == "Accounts Receivable Summary" and not filters.get("company"):
-                default_company = frappe.db.get_single_value("Global Defaults", "default_company")
-                if default_company:
-                    filters["company"] = str(default_company)
-
-            # Add default company for reports that need it
-            if not filters.get("company"):
-                default_company = frappe.db.get_single_value("Global Defaults", "default_company")
-                if default_company:
-                    filters["company"] = str(default_company)
-
-            # Add report-specific default parameters
-            report_name_lower = report_doc.name.lower()
-
-            # Sales Analytics defaults
-            if "sales analytics" in report_name_lower and "value_quantity" not in filters:
-                filters["value_quantity"] = "Value"
-
-            # Quotation Trends defaults
-            if "quotation trends" in report_name_lower and "based_on" not in filters:
-                filters["based_on"] = "Item"
-
-            # Apply default values from JavaScript filter definitions
-            filters = ReportTools._apply_filter_defaults(report_doc, filters)
-
-            # Final cleanup - ensure all filter values are strings or proper types
-            final_filters = {}
-            for key, value in filters.items():
-                if value is not None:
-                    # Convert dates to strings if they're not already
-                    if hasattr(value, "strftime"):  # datetime object
-                        final_filters[key] = value.strftime("%Y-%m-%d")
-                    elif isinstance(value, (str, int, float, bool)):
-                        final_filters[key] = value
-                    else:
-                        final_filters[key] = str(value)
-            filters = final_filters
-
-            # Check if this is a prepared report (after all filter processing)
-            if getattr(report_doc, "prepared_report", False) and not getattr(
-                report_doc, "disable_prepared_report", False
-            ):
-                return ReportTools._handle_prepared_report_execution(report_doc, filters)
-
-            return run(report_name=report_doc.name, filters=filters, user=frappe.session.user)
+            return run(report_name=report_meta.name, filters=filters, user=frappe.session.user)
 
         except Exception as e:
-            frappe.log_error(f"Script report execution error for {report_doc.name}: {str(e)}")
+            frappe.log_error(f"Script report execution error for {report_meta.name}: {str(e)}")
 
             # Provide helpful error messages for common issues
             error_message = str(e)
             if "'NoneType' object has no attribute 'startswith'" in error_message:
-                error_message = f"Missing required filters for {report_doc.name}. This report requires mandatory filters that were not provided. Use the report_requirements tool to discover required filters."
-                if "sales_analytics" in report_doc.name.lower():
+                error_message = f"Missing required filters for {report_meta.name}. This report requires mandatory filters that were not provided. Use the report_requirements tool to discover required filters."
+                if "sales_analytics" in report_meta.name.lower():
                     error_message += " For Sales Analytics, you need: 'doc_type' (e.g., 'Sales Invoice') and 'tree_type' (e.g., 'Customer')."
             elif "required" in error_message.lower() and any(
                 word in error_message.lower() for word in ["filter", "field", "parameter"]
             ):
-                error_message = f"Missing required filters for {report_doc.name}: {error_message}. Use the report_requirements tool to discover all required filters."
+                error_message = f"Missing required filters for {report_meta.name}: {error_message}. Use the report_requirements tool to discover all required filters."
 
             return {
                 "result": [],
                 "columns": [],
                 "message": f"Script report execution failed: {error_message}",
                 "error": error_message,
-                "suggestion": f"Use report_requirements tool with report_name='{report_doc.name}' to discover required filters, then retry with proper filters.",
+                "suggestion": f"Use report_requirements tool with report_name='{report_meta.name}' to discover required filters, then retry with proper filters.",
             }
 
+    # Report type -> execution handler, resolved with a single lookup in execute_report
+    _EXEC_DISPATCH = {
+        "Query Report": _execute_query_report.__func__,
+        "Script Report": _execute_script_report.__func__,
+    }
+
+    @staticmethod
+    def _get_existing_link_names(pending_links: Dict[str, List]) -> Dict[str, set]:
+        """
+        Look up which Link filter values exist, using one UNION query across doctypes.
+
+        Args:
+            pending_links: Mapping of doctype to a list of (filter_key, filter_value) pairs
+
+        Returns:
+            Mapping of doctype to the set of lowercased names that exist
+        """
+        subqueries = []
+        values = []
+        for doctype, entries in pending_links.items():
+            names = [str(filter_value) for _doctype, filter_value in entries]
+            placeholders = ", ".join(["%s"] * len(names))
+            subqueries.append(
+                f"SELECT %s AS doctype, name FROM `tab{doctype}` WHERE name IN ({placeholders})"
+            )
+            values.append(doctype)
+            values.extend(names)
+
+        existing_names = {}
+        for doctype, name in frappe.db.sql(" UNION ALL ".join(subqueries), values):
+            existing_names.setdefault(doctype, set()).add(str(name).lower())
+
+        return existing_names
+
     @staticmethod
-    def _validate_filters(filters: Dict[str, Any], report_doc) -> Dict[str, Any]:
+    def _validate_filters(filters: Dict[str, Any], report_meta) -> Dict[str, Any]:
         """Validate filter values against database to catch invalid references early"""
         errors = []
         suggestions = []
@@ -611,6 +757,8 @@ class ReportTools:
             "warehouse": "Warehouse",
         }
 
+        # Group the Link filters to check by doctype
+        pending_links = {}
         for filter_key, doctype in link_validations.items():
             if filter_key in filters and filters[filter_key]:
                 filter_value = filters[filter_key]
@@ -619,172 +767,215 @@ class ReportTools:
                 if isinstance(filter_value, list):
                     continue
 
-                # Check if the referenced document exists
-                if not frappe.db.exists(doctype, filter_value):
+                pending_links.setdefault(doctype, []).append((filter_key, filter_value))
+
+        # Check all referenced documents exist in a single query
+        existing_names = ReportTools._get_existing_link_names(pending_links) if pending_links else {}
+
+        for doctype, entries in pending_links.items():
+            for filter_key, filter_value in entries:
+                if str(filter_value).lower() not in existing_names.get(doctype, set()):
                     errors.append(f"Invalid {filter_key}: '{filter_value}' does not exist in {doctype}")
 
                     # Try to find similar names to suggest
                     try:
                         similar = frappe.get_all(
-                            doctype, filters={"name": ["like", f"%{filter_value}%"]}, fields=["name"], limit=3
+                            doctype, filters={"name": ["like", f"%{filter_value}%"]}, pluck="name", limit=3
                         )
                         if similar:
                             suggestions.append(
-                                f"Did you mean one of these {doctype} names? {', '.join([s.name for s in similar])}"
+                                f"Did you mean one of these {doctype} names? {', '.join(similar)}"
                             )
                         else:
                             # If no similar matches, show first few valid options
-                            valid_options = frappe.get_all(doctype, fields=["name"], limit=5)
+                            valid_options = frappe.get_all(doctype, pluck="name", limit=5)
                             if valid_options:
                                 suggestions.append(
-                                    f"Valid {doctype} names include: {', '.join([v.name for v in valid_options])}"
+                                    f"Valid {doctype} names include: {', '.join(valid_options)}"
                                 )
                     except Exception:
                         pass
 
         # Validate Select field options
-        select_validations = {
-            "tree_type": [
-                "Customer",
-                "Supplier",
-                "Item",
-                "Customer Group",
-                "Supplier Group",
-                "Item Group",
-                "Territory",
-                "Order Type",
-                "Project",
-            ],
-            "doc_type": [
-                "Sales Invoice",
-                "Sales Order",
-                "Quotation",
-                "Purchase Invoice",
-                "Purchase Order",
-                "Purchase Receipt",
-                "Delivery Note",
-            ],
-            "value_quantity": ["Value", "Quantity"],
-            "range": ["Weekly", "Monthly", "Quarterly", "Half-Yearly", "Yearly"],
-        }
+        for filter_key, valid_options in _SELECT_VALIDATIONS.items():
+            filter_value = filters.get(filter_key)
+            if filter_value and (isinstance(filter_value, (list, dict)) or filter_value not in valid_options):
+                errors.append(
+                    f"Invalid {filter_key}: '{filter_value}'. Must be one of: {_SELECT_DISPLAY[filter_key]}"
+                )
 
-        for filter_key, valid_options in select_validations.items():
-            if filter_key in filters and filters[filter_key]:
-                filter_value = filters[filter_key]
-                if filter_value not in valid_options:
-                    errors.append(
-                        f"Invalid {filter_key}: '{filter_value}'. Must be one of: {', '.join(valid_options)}"
-                    )
+        # Validate date formats; filters are canonicalized, so dates arrive as strings
+        for date_field in ("from_date", "to_date", "posting_date", "transaction_date"):
+            date_value = filters.get(date_field)
+            if not date_value:
+                continue
 
-        # Validate date formats
-        date_fields = ["from_date", "to_date", "posting_date", "transaction_date"]
-        for date_field in date_fields:
-            if date_field in filters and filters[date_field]:
-                try:
-                    from frappe.utils import getdate
-
-                    getdate(filters[date_field])
-                except Exception:
-                    errors.append(
-                        f"Invalid {date_field}: '{filters[date_field]}'. Expected format: YYYY-MM-DD"
-                    )
+            try:
+                getdate(date_value)
+            except Exception:
+                errors.append(f"Invalid {date_field}: '{date_value}'. Expected format: YYYY-MM-DD")
 
         return {"valid": len(errors) == 0, "errors": errors, "suggestions": suggestions}
 
     @staticmethod
-    def _apply_filter_defaults(report_doc, filters):
+    def _apply_filter_defaults(report_meta, filters):
         """Apply default filter values from JavaScript filter definitions for Script Reports"""
-        import os
-        import re
-
         # Only apply for Script Reports
-        if report_doc.report_type != "Script Report":
+        if report_meta.report_type != "Script Report":
             return filters
 
         try:
-            # Get the report's JavaScript file path
-            module_name = report_doc.module
-            report_name = report_doc.name
-            report_folder = report_name.lower().replace(" ", "_").replace("-", "_")
-            module_folder = module_name.lower().replace(" ", "_")
-
-            # Search for the JS file in installed apps
-            for app in frappe.get_installed_apps():
-                app_path = frappe.get_app_path(app)
-                js_path = os.path.join(
-                    app_path, module_folder, "report", report_folder, f"{report_folder}.js"
-                )
-
-                if os.path.exists(js_path):
-                    # Read and parse the JavaScript file
-                    with open(js_path, encoding="utf-8") as f:
-                        js_content = f.read()
-
-                    # Extract filter definitions
-                    filters_start = js_content.find("filters:")
-                    if filters_start == -1:
-                        continue
-
-                    # Find the filter array using bracket counting
-                    bracket_start = js_content.find("[", filters_start)
-                    if bracket_start == -1:
-                        continue
-
-                    bracket_count = 0
-                    bracket_end = -1
-                    for i in range(bracket_start, len(js_content)):
-                        if js_content[i] == "[":
-                            bracket_count += 1
-                        elif js_content[i] == "]":
-                            bracket_count -= 1
-                            if bracket_count == 0:
-                                bracket_end = i
-                                break
-
-                    if bracket_end == -1:
-                        continue
-
-                    filters_text = js_content[bracket_start + 1 : bracket_end]
-
-                    # Parse filter objects
-                    filter_objects = []
-                    brace_count = 0
-                    current_obj_start = None
+            # Locate the report's JavaScript file (memoized per installed app set)
+            js_path = _locate_report_js(
+                tuple(frappe.get_installed_apps()),
+                report_meta.module.lower().replace(" ", "_"),
+                report_meta.name.lower().replace(" ", "_").replace("-", "_"),
+            )
+            if not js_path:
+                return filters
+
+            # Skip the file entirely when every known default is already supplied
+            cached = _FILTER_DEFAULTS_CACHE.get(js_path)
+            if cached and all(filters.get(fieldname) is not None for fieldname in cached[1]):
+                return filters
+
+            # Parse the file only when it changed since the last parse
+            mtime = os.stat(js_path).st_mtime
+            if cached and cached[0] == mtime:
+                defaults = cached[1]
+            else:
+                with open(js_path, "rb") as f:
+                    js_content = f.read().decode("utf-8", errors="replace")
+                defaults = ReportTools._parse_js_filter_defaults(js_content)
+                _FILTER_DEFAULTS_CACHE[js_path] = (mtime, defaults)
 
-                    for i, char in enumerate(filters_text):
-                        if char == "{":
-                            if brace_count == 0:
-                                current_obj_start = i
-                            brace_count += 1
-                        elif char == "}":
-                            brace_count -= 1
-                            if brace_count == 0 and current_obj_start is not None:
-                                obj_content = filters_text[current_obj_start + 1 : i]
-                                filter_objects.append(obj_content)
-                                current_obj_start = None
-
-                    # Extract default values from each filter
-                    for filter_obj in filter_objects:
-                        # Extract fieldname
-                        fieldname_match = re.search(r'fieldname:\s*["\']([^"\']+)["\']', filter_obj)
-                        if not fieldname_match:
-                            continue
-                        fieldname = fieldname_match.group(1)
-
-                        # Skip if filter already has a value
-                        if fieldname in filters and filters[fieldname] is not None:
-                            continue
-
-                        # Extract default value
-                        default_match = re.search(r'default:\s*["\']([^"\']+)["\']', filter_obj)
-                        if default_match:
-                            default_value = default_match.group(1)
-                            filters[fieldname] = default_value
-
-                    break  # Found and processed the JS file
+            # Supplied values win; defaults fill in filters that are missing or None
+            if defaults:
+                filters = {**defaults, **{key: value for key, value in filters.items() if value is not None}}
 
         except Exception as e:
             # Log error but don't fail the report execution
-            frappe.log_error(f"Error applying filter defaults for {report_doc.name}: {str(e)}")
+            frappe.logger("report_tools").debug(
+                f"Error applying filter defaults for {report_meta.name}: {str(e)}"
+            )
 
         return filters
+
+    @staticmethod
+    def _parse_js_filter_defaults(js_content: str) -> Dict[str, str]:
+        """Extract {fieldname: default} for filters with a string default from report JavaScript"""
+        defaults = {}
+        tokens = _JS_TOKEN_RE.finditer(js_content)
+
+        # Find the filters property, ignoring mentions inside strings and comments
+        for match in tokens:
+            if match.group("filters_key"):
+                break
+        else:
+            return defaults
+
+        # Split the filters array into its top-level objects
+        filter_objects = []
+        square_depth = 0
+        brace_depth = 0
+        current_obj_start = None
+
+        for match in tokens:
+            token = match.group("bracket")
+            if not token or (square_depth == 0 and token != "["):
+                continue
+
+            if token == "[":
+                square_depth += 1
+            elif token == "]":
+                square_depth -= 1
+                if square_depth == 0:
+                    break
+            elif token == "{":
+                if brace_depth == 0:
+                    current_obj_start = match.end()
+                brace_depth += 1
+            else:
+                brace_depth -= 1
+                if brace_depth == 0 and current_obj_start is not None:
+                    filter_objects.append(js_content[current_obj_start : match.start()])
+                    current_obj_start = None
+        else:
+            # Unterminated filters array
+            return defaults
+
+        # Extract fieldname and default from each filter in a single scan
+        for filter_obj in filter_objects:
+            attrs = {}
+            for match in _FILTER_ATTRS_RE.finditer(filter_obj):
+                attrs.setdefault(match.group(1), match.group(2))
+
+            if "fieldname" in attrs and "default" in attrs:
+                defaults[attrs["fieldname"]] = attrs["default"]
+
+        return defaults
+
+
+def get_prepared_report_signal_key(prepared_report_name: str) -> str:
+    """Cache key of the Redis list used to signal prepared report completion"""
+    return f"assistant_prepared_report_done:{prepared_report_name}"
+
+
+def notify_prepared_report_status(doc, method=None):
+    """
+    Prepared Report on_update hook: wake up any execute_report call waiting on this report.
+
+    The signal is pushed after commit so the waiter reads the final status.
+    """
+    if doc.status not in ("Completed", "Error"):
+        return
+
+    def push_signal():
+        try:
+            key = get_prepared_report_signal_key(doc.name)
+            frappe.cache.lpush(key, doc.status)
+            frappe.cache.expire(frappe.cache.make_key(key), 600)
+        except Exception as e:
+            frappe.logger("report_tools").debug(
+                f"Could not signal prepared report {doc.name} completion: {str(e)}"
+            )
+
+    frappe.db.after_commit.add(push_signal)
+
+
+@functools.lru_cache(maxsize=None)
+def _locate_report_js(apps: Tuple[str, ...], module_folder: str, report_folder: str) -> Optional[str]:
+    """
+    Return the path of a Script Report's JavaScript file within the given apps, or None.
+
+    The installed apps are part of the cache key, so installing or removing an app
+    (or serving another site from the same process) never reuses a stale path. Files
+    without a filters block are skipped, so a bare override in another app does not
+    hide the defaults declared by the app that defines the report.
+    """
+    for app in apps:
+        js_path = os.path.join(
+            frappe.get_app_path(app), module_folder, "report", report_folder, f"{report_folder}.js"
+        )
+        if os.path.exists(js_path) and _has_filters_block(js_path):
+            return js_path
+
+    return None
+
+
+def _has_filters_block(js_path: str) -> bool:
+    """Whether a report JavaScript file declares a filters property outside strings and comments"""
+    with open(js_path, "rb") as f:
+        js_content = f.read().decode("utf-8", errors="replace")
+    return any(match.group("filters_key") for match in _JS_TOKEN_RE.finditer(js_content))
+
+
+def clear_fiscal_year_cache(doc=None, method=None):
+    """Fiscal Year doc event: forget the cached latest fiscal year"""
+    frappe.cache.delete_value(_FISCAL_YEAR_CACHE_KEY)
+
+
+def clear_report_js_cache():
+    """clear_cache hook: forget located report JavaScript files and their parsed filter defaults"""
+    _locate_report_js.cache_clear()
+    _FILTER_DEFAULTS_CACHE.clear()
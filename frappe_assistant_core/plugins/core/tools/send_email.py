@@ -19,12 +19,367 @@ Send Email Tool for Core Plugin.
 Creates email drafts with recipient search, message improvement, and preview.
 """
 
-from typing import Any, Dict
+import hashlib
+import json
+import re
+import time
+import unicodedata
+from bisect import bisect_left
+from dataclasses import dataclass
+from itertools import islice
+from typing import Any, Dict, List, Set, Tuple, Union
 import frappe
 from frappe import _
+from frappe.utils import get_datetime
 
 from frappe_assistant_core.core.base_tool import BaseTool
 
+# Seconds a loaded recipient directory is reused before Users and Contacts are read again
+_DIRECTORY_TTL = 60
+
+# Recipient directories keyed by site: (monotonic load time, generation, directory)
+_DIRECTORY_CACHE: Dict[str, Tuple[float, str, "RecipientDirectory"]] = {}
+
+# Shared cache key holding the current recipient generation, replaced whenever a User or
+# Contact changes; it is part of every miss key, so old misses are simply never read again
+_MISS_GEN_KEY = "send_email:miss_gen"
+
+# Seconds a name that matched no User or Contact is answered from the shared cache
+_MISS_TTL = 60
+
+# Contacts beyond this count are searched in the database instead of held in each worker
+_DIRECTORY_MAX_CONTACTS = 20000
+
+# Length of the character n-grams indexed for substring lookups
+_NGRAM_SIZE = 3
+
+# A single address: no whitespace, one '@', and a dot in the domain
+_EMAIL_RE = re.compile(r"[^@\s]+@[^@\s]+\.[^@\s]+")
+
+# Standard and meta fields left out of the fallback PDF's field table
+_PDF_SKIPPED_FIELDS = frozenset({
+	"doctype", "name", "owner", "creation", "modified", "modified_by", "docstatus",
+	"idx", "_user_tags", "_comments", "_assign", "_liked_by"
+})
+
+# Fields holding the recipient email of common transaction doctypes, in priority order
+_EMAIL_FIELDS_BY_DOCTYPE = {
+	"Sales Invoice": ("contact_email", "customer_email"),
+	"Quotation": ("contact_email", "customer_email"),
+	"Sales Order": ("contact_email", "customer_email"),
+	"Delivery Note": ("contact_email", "customer_email"),
+	"Purchase Invoice": ("contact_email", "supplier_email"),
+	"Purchase Order": ("contact_email", "supplier_email"),
+	"Purchase Receipt": ("contact_email", "supplier_email"),
+	"Supplier Quotation": ("contact_email", "supplier_email"),
+}
+
+# Email fields tried on any other doctype
+_DEFAULT_EMAIL_FIELDS = ("contact_email", "email_id", "email")
+
+# Greetings skipped when deriving a subject from the opening line of a message
+_GREETING_RE = re.compile(r"(?:Bonjour|Hello|Hi|Salut)")
+
+
+@dataclass(frozen=True)
+class RecipientEntry:
+	"""A User or Contact that email can be addressed to"""
+
+	display_name: str
+	email: str
+	# Lowercased fields a recipient name is matched against
+	search_fields: Tuple[str, ...]
+
+
+class RecipientIndex:
+	"""
+	Recipient entries with a sorted field list for prefix lookups and a trigram index,
+	so substring lookups only verify likely candidates.
+	"""
+
+	def __init__(self, entries: List[RecipientEntry]):
+		self.entries = entries
+		self._postings: Dict[str, Set[int]] = {}
+
+		for position, entry in enumerate(entries):
+			for field in entry.search_fields:
+				for gram in _ngrams(field):
+					self._postings.setdefault(gram, set()).add(position)
+
+		# Emails of the entries each lowercased display name or search field belongs to
+		self.exact: Dict[str, Set[str]] = {}
+		for entry in entries:
+			for key in (_fold(entry.display_name), *entry.search_fields):
+				self.exact.setdefault(key, set()).add(entry.email)
+
+		# (field, position) pairs in field order; fields sharing a prefix are adjacent
+		self._fields = sorted(
+			(field, position) for position, entry in enumerate(entries) for field in entry.search_fields
+		)
+
+	def search(self, needle: str, limit: int) -> List[RecipientEntry]:
+		"""
+		Return up to `limit` entries with a search field containing `needle`, in directory order.
+
+		When more than `limit` entries have a field starting with `needle`, those are returned
+		without a substring scan: the result is full (and so ambiguous) either way. Fewer
+		prefix hits fall through to the substring search, so "martin" still finds both
+		"Martin Leroy" and "Paul Martin".
+		"""
+		positions = set()
+		for field, position in islice(self._fields, bisect_left(self._fields, (needle,)), None):
+			if not field.startswith(needle):
+				break
+			positions.add(position)
+		if len(positions) > limit:
+			return [self.entries[position] for position in sorted(positions)[:limit]]
+
+		if len(needle) < _NGRAM_SIZE:
+			positions = range(len(self.entries))
+		else:
+			# Only entries containing every trigram of the needle can contain the needle
+			postings = sorted((self._postings.get(gram, set()) for gram in _ngrams(needle)), key=len)
+			positions = sorted(postings[0].intersection(*postings[1:]))
+
+		matches = (
+			self.entries[position]
+			for position in positions
+			if any(needle in field for field in self.entries[position].search_fields)
+		)
+		return list(islice(matches, limit))
+
+
+class ContactQuery:
+	"""
+	Contact lookups run against the database, for sites with more than
+	_DIRECTORY_MAX_CONTACTS Contacts. Matches the RecipientIndex interface, with no
+	entries held in memory, so exact resolution and fuzzy scoring cover Users only.
+	"""
+
+	entries: List[RecipientEntry] = []
+	exact: Dict[str, Set[str]] = {}
+
+	def search(self, needle: str, limit: int) -> List[RecipientEntry]:
+		"""
+		Return up to `limit` Contacts with a field containing `needle`, most recently modified first.
+
+		A prefix query runs first, as it can use the field indexes; the leading-wildcard
+		substring scan only runs when it finds no more than `limit` Contacts, matching
+		RecipientIndex.search.
+		"""
+		contacts = self._query(f"{needle}%", limit + 1)
+		if len(contacts) <= limit:
+			contacts = self._query(f"%{needle}%", limit)
+		return [
+			RecipientEntry(
+				display_name=f"{c.first_name or ''} {c.last_name or ''}".strip() or c.name,
+				email=c.email_id,
+				search_fields=_search_fields(c.first_name, c.last_name, c.email_id, c.name)
+			)
+			for c in contacts[:limit]
+		]
+
+	@staticmethod
+	def _query(pattern: str, limit: int) -> list:
+		"""Contacts with a name or email field LIKE `pattern`, most recently modified first"""
+		# LIKE runs under the database's case- and accent-insensitive collation
+		return frappe.get_all(
+			"Contact",
+			fields=["name", "email_id", "first_name", "last_name"],
+			or_filters=[
+				{"first_name": ["like", pattern]},
+				{"last_name": ["like", pattern]},
+				{"email_id": ["like", pattern]},
+				{"name": ["like", pattern]}
+			],
+			order_by="modified desc",
+			limit=limit
+		)
+
+
+@dataclass(frozen=True)
+class RecipientDirectory:
+	"""Enabled Users and all Contacts, most recently modified first"""
+
+	users: RecipientIndex
+	contacts: Union[RecipientIndex, ContactQuery]
+	# Users followed by in-memory Contacts, with their folded display names for fuzzy scoring
+	all_entries: List[RecipientEntry]
+	names_lower: List[str]
+	# len(names_lower[i]), used to prune fuzzy candidates by length
+	name_lengths: List[int]
+	# Every n-gram of names_lower, to skip fuzzy scoring for names sharing nothing with the directory
+	name_ngrams: frozenset
+
+
+def get_recipient_directory() -> RecipientDirectory:
+	"""
+	Return this site's recipient directory, reloading it once it is older than _DIRECTORY_TTL
+	or a User or Contact changed in any worker since it was loaded.
+	"""
+	site = frappe.local.site
+	generation = _recipient_generation()
+	cached = _DIRECTORY_CACHE.get(site)
+	if cached and cached[1] == generation and time.monotonic() - cached[0] < _DIRECTORY_TTL:
+		return cached[2]
+
+	# Large Contact tables stay in the database rather than in every worker's memory
+	load_contacts = frappe.db.count("Contact") <= _DIRECTORY_MAX_CONTACTS
+	contact_query = """
+		UNION ALL
+		SELECT 'Contact' AS source, name, email_id, NULL, first_name, last_name,
+			COALESCE(NULLIF(TRIM(CONCAT_WS(' ', first_name, last_name)), ''), name), modified
+		FROM `tabContact`
+	""" if load_contacts else ""
+
+	# Enabled Users and all Contacts in one round trip, most recently modified first
+	rows = frappe.db.sql(
+		f"""
+		SELECT 'User' AS source, name, email, full_name, NULL AS first_name, NULL AS last_name,
+			COALESCE(NULLIF(full_name, ''), name) AS display_name, modified
+		FROM `tabUser`
+		WHERE enabled = 1
+		{contact_query}
+		ORDER BY modified DESC
+		""",
+		as_dict=True
+	)
+
+	users = []
+	contacts = []
+	for row in rows:
+		if row.source == "User":
+			users.append(RecipientEntry(
+				display_name=row.display_name,
+				email=row.email or row.name,
+				search_fields=_search_fields(row.full_name, row.email, row.name)
+			))
+		else:
+			contacts.append(RecipientEntry(
+				display_name=row.display_name,
+				email=row.email,
+				search_fields=_search_fields(row.first_name, row.last_name, row.email, row.name)
+			))
+
+	all_entries = users + contacts
+	names_lower = [_fold(entry.display_name) for entry in all_entries]
+	directory = RecipientDirectory(
+		users=RecipientIndex(users),
+		contacts=RecipientIndex(contacts) if load_contacts else ContactQuery(),
+		all_entries=all_entries,
+		names_lower=names_lower,
+		name_lengths=[len(name) for name in names_lower],
+		name_ngrams=frozenset(gram for name in names_lower for gram in _ngrams(name))
+	)
+	_DIRECTORY_CACHE[site] = (time.monotonic(), generation, directory)
+	return directory
+
+
+def _looks_like_email(value: str) -> bool:
+	"""Basic email check: an '@' followed by a domain containing a dot"""
+	return _EMAIL_RE.fullmatch(value.strip()) is not None
+
+
+def _ngrams(value: str) -> Set[str]:
+	"""The distinct _NGRAM_SIZE-character substrings of value"""
+	return {value[start : start + _NGRAM_SIZE] for start in range(len(value) - _NGRAM_SIZE + 1)}
+
+
+def _fold(value: str) -> str:
+	"""Lowercase value and strip its accents, as the database's *_unicode_ci collations compare"""
+	if value.isascii():
+		return value.lower()
+	decomposed = unicodedata.normalize("NFKD", value)
+	return "".join(char for char in decomposed if not unicodedata.combining(char)).lower()
+
+
+def _search_fields(*values) -> Tuple[str, ...]:
+	"""Folded, de-duplicated non-empty values (a User's name is usually also its email)"""
+	return tuple(dict.fromkeys(_fold(value) for value in values if value))
+
+
+def clear_recipient_directory(doc=None, method=None):
+	"""
+	User/Contact doc event: drop this site's cached recipient directory and known misses.
+
+	Starts a new recipient generation instead of deleting the miss keys, as a KEYS scan
+	on every User or Contact save would block Redis for the whole bench.
+	"""
+	_DIRECTORY_CACHE.pop(frappe.local.site, None)
+	frappe.cache.set_value(_MISS_GEN_KEY, frappe.generate_hash(length=10))
+
+
+def _recipient_generation() -> str:
+	"""The current recipient generation, shared by all workers of the site"""
+	return frappe.cache.get_value(_MISS_GEN_KEY) or ""
+
+
+def deliver_communication(communication_id: str, mark_sent: bool = False):
+	"""
+	Background job: send a Communication draft via frappe.sendmail.
+
+	Drafts confirmed with confirm_send_email are marked Sent and Linked (mark_sent);
+	emails sent straight from send_email are left Open. A failed send is logged and
+	recorded as delivery_status "Error", so confirm_send_email can report it.
+	"""
+	comm = frappe.get_doc("Communication", communication_id)
+
+	# Guard against the same draft being queued twice
+	if comm.email_status in ["Sent", "Delivered"]:
+		return
+
+	# Get attachments from Communication if any
+	attachments_list = []
+	if comm.has_attachment:
+		frappe.logger("send_email").info(
+			f"📎 Loading attachments for Communication {comm.name}"
+		)
+		attached_files = frappe.get_all(
+			"File",
+			filters={
+				"attached_to_doctype": "Communication",
+				"attached_to_name": comm.name
+			},
+			fields=["name", "file_name"]
+		)
+		# Format attachments as dicts with 'fid' key (required by frappe.sendmail)
+		attachments_list = [{"fid": f.name} for f in attached_files]
+		frappe.logger("send_email").info(
+			f"📎 Found {len(attachments_list)} attachment(s): {[f['file_name'] for f in attached_files]}"
+		)
+
+	# Send via frappe.sendmail
+	try:
+		frappe.sendmail(
+			recipients=comm.recipients,
+			cc=comm.cc,
+			bcc=comm.bcc,
+			subject=comm.subject,
+			message=comm.content,
+			attachments=attachments_list if attachments_list else None,
+			reference_doctype="Communication",
+			reference_name=comm.name,
+			now=True
+		)
+	except Exception as e:
+		# Nobody waits on this job, so keep the failure on the Communication itself
+		frappe.db.rollback()
+		frappe.log_error(
+			title=_("Send Email Error"),
+			message=f"Error delivering email {comm.name}: {str(e)}",
+			reference_doctype="Communication",
+			reference_name=comm.name
+		)
+		frappe.db.set_value("Communication", comm.name, "delivery_status", "Error", update_modified=False)
+		return
+
+	# Update communication status; the worker commits when the job returns
+	if mark_sent:
+		status = {"email_status": "Sent", "delivery_status": "Sent", "status": "Linked"}
+	else:
+		status = {"email_status": "Open"}
+	frappe.db.set_value("Communication", comm.name, status, update_modified=False)
+
 
 class SendEmail(BaseTool):
 	"""
@@ -38,10 +393,8 @@ class SendEmail(BaseTool):
 	5. Use confirm_send_email tool to actually send
 	"""
 
-	def __init__(self):
-		super().__init__()
-		self.name = "send_email"
-		self.description = """Prépare et envoie des emails avec résolution intelligente du destinataire.
+	# Static tool metadata, built once when the class is defined
+	DESCRIPTION = """Prépare et envoie des emails avec résolution intelligente du destinataire.
 
 📧 PARAMÈTRE RECIPIENT (destinataire):
   • Email complet: "jeremy@example.com" → utilisé directement
@@ -153,71 +506,86 @@ Exemple 4 - Avec CC/BCC:
 
     Cordialement,
     Administrator"""
-		self.requires_permission = "Email"
 
-		self.inputSchema = {
-			"type": "object",
-			"properties": {
-				"recipient": {
-					"type": "string",
-					"description": "Recipient name (e.g., 'Jeremy', 'John Doe') or email address. Tool will search Users and Contacts to find the email. Can be omitted if auto_find_recipient=true and attach_document is provided."
-				},
-				"subject": {
-					"type": "string",
-					"description": "Email subject line. If not provided, will be auto-generated from message content."
-				},
-				"message": {
-					"type": "string",
-					"description": "Email message body. Can be informal - tool will improve formatting and add greetings/signature if improve_message=true."
-				},
-				"send_now": {
-					"type": "boolean",
-					"default": False,
-					"description": "If true, sends email immediately. If false (recommended), creates draft and returns preview for user confirmation. Use confirm_send_email tool to send after user approves."
-				},
-				"cc": {
-					"type": "string",
-					"description": "Optional CC recipients (comma-separated emails or names)."
-				},
-				"bcc": {
-					"type": "string",
-					"description": "Optional BCC recipients (comma-separated emails or names)."
-				},
-				"attach_document": {
-					"type": "object",
-					"description": "Attach a document as PDF (e.g., Sales Invoice, Quotation). The document will be rendered using its print format and attached to the email.",
-					"properties": {
-						"doctype": {
-							"type": "string",
-							"description": "Document type name (e.g., 'Sales Invoice', 'Quotation', 'Purchase Order')"
-						},
-						"name": {
-							"type": "string",
-							"description": "Document name/ID. Can be partial - will search for matching documents."
-						},
-						"print_format": {
-							"type": "string",
-							"description": "Optional: Print format name to use. If not specified, uses default print format for the doctype."
-						}
+	INPUT_SCHEMA = {
+		"type": "object",
+		"properties": {
+			"recipient": {
+				"type": "string",
+				"description": "Recipient name (e.g., 'Jeremy', 'John Doe') or email address. Tool will search Users and Contacts to find the email. Can be omitted if auto_find_recipient=true and attach_document is provided."
+			},
+			"subject": {
+				"type": "string",
+				"description": "Email subject line. If not provided, will be auto-generated from message content."
+			},
+			"message": {
+				"type": "string",
+				"description": "Email message body. Can be informal - tool will improve formatting and add greetings/signature if improve_message=true."
+			},
+			"send_now": {
+				"type": "boolean",
+				"default": False,
+				"description": "If true, sends email immediately. If false (recommended), creates draft and returns preview for user confirmation. Use confirm_send_email tool to send after user approves."
+			},
+			"cc": {
+				"type": "string",
+				"description": "Optional CC recipients (comma-separated emails or names)."
+			},
+			"bcc": {
+				"type": "string",
+				"description": "Optional BCC recipients (comma-separated emails or names)."
+			},
+			"attach_document": {
+				"type": "object",
+				"description": "Attach a document as PDF (e.g., Sales Invoice, Quotation). The document will be rendered using its print format and attached to the email.",
+				"properties": {
+					"doctype": {
+						"type": "string",
+						"description": "Document type name (e.g., 'Sales Invoice', 'Quotation', 'Purchase Order')"
 					},
-					"required": ["doctype", "name"]
-				},
-				"attachments": {
-					"type": "array",
-					"description": "Optional: List of File DocType names to attach to the email (for existing files in the system).",
-					"items": {
-						"type": "string"
+					"name": {
+						"type": "string",
+						"description": "Document name/ID. Can be partial - will search for matching documents."
+					},
+					"print_format": {
+						"type": "string",
+						"description": "Optional: Print format name to use. If not specified, uses default print format for the doctype."
 					}
 				},
-				"auto_find_recipient": {
-					"type": "boolean",
-					"default": False,
-					"description": "If true and attach_document is provided, automatically find recipient email from the document (e.g., customer email from Sales Invoice). Useful when sending invoices/quotes to customers."
+				"required": ["doctype", "name"]
+			},
+			"attachments": {
+				"type": "array",
+				"description": "Optional: List of File DocType names to attach to the email (for existing files in the system).",
+				"items": {
+					"type": "string"
 				}
 			},
-			"required": ["message"]
+			"auto_find_recipient": {
+				"type": "boolean",
+				"default": False,
+				"description": "If true and attach_document is provided, automatically find recipient email from the document (e.g., customer email from Sales Invoice). Useful when sending invoices/quotes to customers."
+			}
+		},
+		"required": ["message"]
+	}
+
+	def __init__(self):
+		super().__init__()
+		self.name = "send_email"
+		self.description = self.DESCRIPTION
+		self.requires_permission = "Email"
+		self.default_config = {
+			# Write drafts with a single INSERT instead of the Communication controller (opt-in:
+			# validation, naming and after_insert hooks are skipped)
+			"fast_draft_insert": False,
+			# Seconds a repeated identical draft request returns the existing draft (0 disables)
+			"draft_cache_ttl": 300
 		}
 
+		self.inputSchema = self.INPUT_SCHEMA
+		self._log = frappe.logger("send_email")
+
 	def execute(self, arguments: Dict[str, Any]) -> Dict[str, Any]:
 		"""Prepare and optionally send an email"""
 		recipient = arguments.get("recipient")
@@ -230,6 +598,15 @@ Exemple 4 - Avec CC/BCC:
 		attachments = arguments.get("attachments", [])
 		auto_find_recipient = arguments.get("auto_find_recipient", False)
 
+		# Retried or regenerated draft requests return the draft already created for them
+		draft_cache_key = None
+		if not send_now and self.get_config().get("draft_cache_ttl"):
+			draft_cache_key = self._draft_cache_key(arguments)
+			cached_draft = self._get_cached_draft(draft_cache_key)
+			if cached_draft:
+				self._log.info("♻️ Reusing draft %s", cached_draft["communication_id"])
+				return cached_draft
+
 		try:
 			# Step 0: Handle document attachment and auto-recipient resolution
 			attachments_to_send = []
@@ -253,15 +630,16 @@ Exemple 4 - Avec CC/BCC:
 				if auto_find_recipient and not recipient:
 					recipient_result = self._get_recipient_from_document(
 						doctype=attach_document.get("doctype"),
-						doc_name=document_info["name"]
+						doc_name=document_info["name"],
+						doc=document_info["doc"]
 					)
 
 					if not recipient_result["success"]:
 						return recipient_result  # Return error if recipient not found
 
 					recipient = recipient_result["email"]
-					frappe.logger("send_email").info(
-						f"✅ Auto-found recipient from document: {recipient}"
+					self._log.info(
+						"✅ Auto-found recipient from document: %s", recipient
 					)
 
 			# Add existing file attachments
@@ -344,21 +722,25 @@ Exemple 4 - Avec CC/BCC:
 			# Don't set email_status yet - it will be set when actually sent
 			comm.status = "Open"
 
-			comm.insert()
+			# Emails sent right away go through the controller so Communication hooks still fire
+			if not send_now and self.get_config().get("fast_draft_insert"):
+				self._insert_draft(comm)
+			else:
+				comm.insert()
 
 			# Step 5.5: Attach files to Communication if any
 			if attachments_to_send:
-				frappe.logger("send_email").info(
-					f"📎 Attaching {len(attachments_to_send)} file(s) to Communication {comm.name}"
+				self._log.info(
+					"📎 Attaching %s file(s) to Communication %s", len(attachments_to_send), comm.name
 				)
 				try:
 					from frappe.core.doctype.communication.email import add_attachments
 					add_attachments(comm.name, attachments_to_send)
 					comm.has_attachment = 1
-					comm.save()
+					frappe.db.set_value("Communication", comm.name, "has_attachment", 1, update_modified=False)
 					frappe.db.commit()
 				except Exception as e:
-					frappe.logger("send_email").error(f"Failed to attach files: {str(e)}")
+					self._log.error("Failed to attach files: %s", e)
 					# Continue anyway - email can still be sent without attachment
 
 			# Step 6: Generate preview
@@ -380,21 +762,22 @@ Exemple 4 - Avec CC/BCC:
 						"communication_id": comm.name,
 						"recipient": recipient_email,
 						"subject": improved_subject,
-						"sent": True,
-						"message": f"Email sent to {recipient_email}",
+						"sent": False,
+						"queued": True,
+						"message": f"Email queued for sending to {recipient_email}",
 						"preview": preview_markdown
 					}
 				else:
 					return {
 						"success": False,
 						"communication_id": comm.name,
-						"error": f"Draft created but send failed: {send_result.get('error')}",
+						"error": f"Draft created but queueing failed: {send_result.get('error')}",
 						"preview": preview_markdown,
 						"next_step": "Use confirm_send_email tool to retry sending"
 					}
 
 			# Return draft for confirmation
-			return {
+			draft = {
 				"success": True,
 				"communication_id": comm.name,
 				"recipient": recipient_email,
@@ -418,6 +801,15 @@ Exemple 4 - Avec CC/BCC:
 				}
 			}
 
+			if draft_cache_key:
+				frappe.cache.set_value(
+					draft_cache_key,
+					{"draft": draft, "modified": str(comm.modified)},
+					expires_in_sec=self.get_config().get("draft_cache_ttl")
+				)
+
+			return draft
+
 		except Exception as e:
 			frappe.log_error(
 				title=_("Send Email Error"),
@@ -429,6 +821,76 @@ Exemple 4 - Avec CC/BCC:
 				"error_type": "email_preparation_error"
 			}
 
+	def _draft_cache_key(self, arguments: Dict[str, Any]) -> str:
+		"""Cache key for a draft request: the session user plus a hash of its arguments"""
+		digest = hashlib.sha1(json.dumps(arguments, sort_keys=True, default=str).encode()).hexdigest()
+		return f"send_email:draft:{frappe.session.user}:{digest}"
+
+	def _get_cached_draft(self, key: str) -> Dict[str, Any]:
+		"""Return the cached draft response, unless the draft was since sent, modified or deleted"""
+		cached = frappe.cache.get_value(key)
+		if not cached:
+			return None
+
+		draft = cached["draft"]
+		current = frappe.db.get_value(
+			"Communication", draft["communication_id"], ["email_status", "modified"], as_dict=True
+		)
+		if (
+			not current
+			or current.email_status in ["Sent", "Delivered"]
+			or get_datetime(current.modified) != get_datetime(cached["modified"])
+		):
+			frappe.cache.delete_value(key)
+			return None
+
+		return draft
+
+	def _insert_draft(self, comm) -> None:
+		"""
+		Persist a Communication draft with a single INSERT.
+
+		Only used when fast_draft_insert is enabled in the tool config. The create
+		permission and the email timeline links are still applied, but the rest of
+		the document controller (validation, naming, insert hooks, realtime updates)
+		is skipped; emails sent immediately always use comm.insert().
+		"""
+		frappe.has_permission("Communication", "create", throw=True)
+
+		now = frappe.utils.now()
+		comm.name = frappe.generate_hash(length=10)
+		comm.owner = comm.modified_by = frappe.session.user
+		comm.creation = comm.modified = comm.communication_date = now
+
+		frappe.db.sql(
+			"""
+			INSERT INTO `tabCommunication` (
+				name, creation, modified, owner, modified_by, communication_date,
+				communication_type, communication_medium, sent_or_received, status,
+				subject, content, sender, sender_full_name, recipients, cc, bcc
+			) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+			""",
+			(
+				comm.name, comm.creation, comm.modified, comm.owner, comm.modified_by, comm.communication_date,
+				comm.communication_type, comm.communication_medium, comm.sent_or_received, comm.status,
+				comm.subject, comm.content, comm.sender, comm.sender_full_name, comm.recipients,
+				comm.cc, comm.bcc
+			)
+		)
+
+		# Link the draft to the Contacts of its addresses, as Communication.validate() does
+		comm.parse_email_for_timeline_links()
+		comm.set_timeline_links()
+		comm.deduplicate_timeline_links()
+		for idx, link in enumerate(comm.timeline_links, start=1):
+			link.update({
+				"parent": comm.name,
+				"parenttype": "Communication",
+				"parentfield": "timeline_links",
+				"idx": idx
+			})
+			link.db_insert()
+
 	def _find_recipient(self, recipient: str):
 		"""
 		Enhanced recipient resolution with ambiguity detection and fuzzy search.
@@ -438,107 +900,108 @@ Exemple 4 - Avec CC/BCC:
 			dict: Error/ambiguity info if multiple/no matches
 			None: No match and no suggestions
 		"""
-		frappe.logger("send_email").info(f"🔍 Searching for recipient: '{recipient}'")
-
-		# If it looks like an email, validate and return
-		if "@" in recipient:
-			# Basic email validation
-			if "." in recipient.split("@")[1]:
-				frappe.logger("send_email").info(f"✉️ Using email directly: {recipient}")
-				return recipient.strip()
-
-		# Search in Users (increased limit to detect ambiguity)
-		users = frappe.get_all(
-			"User",
-			filters={"enabled": 1},
-			fields=["name", "email", "full_name"],
-			or_filters=[
-				{"full_name": ["like", f"%{recipient}%"]},
-				{"email": ["like", f"%{recipient}%"]},
-				{"name": ["like", f"%{recipient}%"]}
-			],
-			limit=5  # Increased from 1 to detect multiple matches
-		)
+		# Use email addresses directly, before any logging or lookup work
+		if _looks_like_email(recipient):
+			return recipient.strip()
+
+		# Memoized for the current request: the same name may appear in to, cc and bcc
+		recipients = getattr(frappe.local, "_fac_recipients", None)
+		if recipients is None:
+			recipients = frappe.local._fac_recipients = {}
+		key = recipient.strip().lower()
+		if key not in recipients:
+			# Names already known to match nobody skip the search, across requests and workers
+			miss_key = f"send_email:miss:{_recipient_generation()}:{key}"
+			if frappe.cache.get_value(miss_key):
+				recipients[key] = None
+			else:
+				recipients[key] = self._search_recipient(recipient)
+				if recipients[key] is None:
+					frappe.cache.set_value(miss_key, 1, expires_in_sec=_MISS_TTL)
+		return recipients[key]
+
+	def _search_recipient(self, recipient: str):
+		"""Resolve a recipient name against the directory; see _find_recipient"""
+		self._log.info("🔍 Searching for recipient: '%s'", recipient)
 
-		frappe.logger("send_email").info(f"👤 User search: found {len(users)} match(es)")
+		directory = get_recipient_directory()
+		needle = _fold(recipient)
+
+		# Search in Users (up to 5 to detect ambiguity)
+		users = directory.users.search(needle, limit=5)
+
+		self._log.info("👤 User search: found %s match(es)", len(users))
 
 		# Handle multiple matches - ask user to clarify
 		if len(users) > 1:
-			frappe.logger("send_email").warning(f"⚠️ Ambiguous: {len(users)} users match '{recipient}'")
+			self._log.warning("⚠️ Ambiguous: %s users match '%s'", len(users), recipient)
 			return {
 				"ambiguous": True,
 				"type": "User",
 				"matches": [
-					{"name": u.full_name, "email": u.email or u.name}
+					{"name": u.display_name, "email": u.email}
 					for u in users
 				]
 			}
 
 		# Single user match found
 		if len(users) == 1:
-			resolved_email = users[0].email or users[0].name
-			frappe.logger("send_email").info(
-				f"✅ Resolved '{recipient}' → '{resolved_email}' ({users[0].full_name})"
+			resolved_email = users[0].email
+			self._log.info(
+				"✅ Resolved '%s' → '%s' (%s)", recipient, resolved_email, users[0].display_name
 			)
 			return resolved_email
 
 		# Search in Contacts (same pattern)
-		contacts = frappe.get_all(
-			"Contact",
-			fields=["name", "email_id", "first_name", "last_name"],
-			or_filters=[
-				{"first_name": ["like", f"%{recipient}%"]},
-				{"last_name": ["like", f"%{recipient}%"]},
-				{"email_id": ["like", f"%{recipient}%"]},
-				{"name": ["like", f"%{recipient}%"]}
-			],
-			limit=5
-		)
+		contacts = directory.contacts.search(needle, limit=5)
 
-		frappe.logger("send_email").info(f"📇 Contact search: found {len(contacts)} match(es)")
+		self._log.info("📇 Contact search: found %s match(es)", len(contacts))
 
 		# Handle multiple contact matches
 		if len(contacts) > 1:
-			frappe.logger("send_email").warning(f"⚠️ Ambiguous: {len(contacts)} contacts match '{recipient}'")
+			self._log.warning("⚠️ Ambiguous: %s contacts match '%s'", len(contacts), recipient)
 			return {
 				"ambiguous": True,
 				"type": "Contact",
 				"matches": [
-					{
-						"name": f"{c.first_name or ''} {c.last_name or ''}".strip() or c.name,
-						"email": c.email_id
-					}
+					{"name": c.display_name, "email": c.email}
 					for c in contacts
 				]
 			}
 
 		# Single contact match found
 		if len(contacts) == 1:
-			resolved_email = contacts[0].email_id
-			contact_name = f"{contacts[0].first_name or ''} {contacts[0].last_name or ''}".strip() or contacts[0].name
-			frappe.logger("send_email").info(
-				f"✅ Resolved '{recipient}' → '{resolved_email}' ({contact_name})"
+			resolved_email = contacts[0].email
+			self._log.info(
+				"✅ Resolved '%s' → '%s' (%s)", recipient, resolved_email, contacts[0].display_name
 			)
 			return resolved_email
 
+		# A longer name sharing no n-gram with any directory name is almost certainly not a
+		# typo of one (e.g. a hallucinated colleague), so skip scoring the whole directory.
+		# Short names are always scored: "jon" shares no trigram with "john" yet scores 86%
+		if len(needle) > _NGRAM_SIZE + 2 and directory.name_ngrams.isdisjoint(_ngrams(needle)):
+			self._log.warning("❌ No recipient found for '%s'", recipient)
+			return None
+
 		# No exact matches - try fuzzy search
-		frappe.logger("send_email").info(f"🔎 No exact match, trying fuzzy search...")
+		self._log.info("🔎 No exact match, trying fuzzy search...")
 		fuzzy_matches = self._fuzzy_search_recipients(recipient)
 
 		if fuzzy_matches:
-			frappe.logger("send_email").info(f"💡 Fuzzy search found {len(fuzzy_matches)} suggestions")
+			self._log.info("💡 Fuzzy search found %s suggestions", len(fuzzy_matches))
 			return {
 				"not_found": True,
 				"suggestions": fuzzy_matches
 			}
 
 		# Absolutely no matches found
-		frappe.logger("send_email").warning(f"❌ No recipient found for '{recipient}'")
+		self._log.warning("❌ No recipient found for '%s'", recipient)
 		return None
 
 	def _fuzzy_search_recipients(self, query: str) -> list:
 		"""
-		Fuzzy search for recipients using difflib for typo tolerance.
+		Fuzzy search for recipients using RapidFuzz for typo tolerance.
 
 		Args:
 			query: Name to search for (e.g., "Jeremmy" with typo)
@@ -547,73 +1010,57 @@ Exemple 4 - Avec CC/BCC:
 			list: Top 3 suggestions with similarity scores
 				[{"name": "Jeremy", "email": "jeremy@...", "similarity": 85}, ...]
 		"""
-		import difflib
-
-		frappe.logger("send_email").info(f"🔎 Fuzzy search starting for: '{query}'")
-
-		# Get all enabled users
-		all_users = frappe.get_all(
-			"User",
-			filters={"enabled": 1},
-			fields=["email", "full_name", "name"]
-		)
-
-		# Calculate similarity scores
-		matches = []
-		query_lower = query.lower()
-
-		for user in all_users:
-			name = user.full_name or user.name or ""
-			if not name:
-				continue
-
-			# Calculate similarity ratio (0.0 to 1.0)
-			similarity = difflib.SequenceMatcher(
-				None,
-				query_lower,
-				name.lower()
-			).ratio()
-
-			# Keep matches above 60% similarity threshold
-			if similarity > 0.6:
-				matches.append({
-					"name": user.full_name or user.name,
-					"email": user.email or user.name,
-					"similarity": round(similarity * 100)  # Convert to percentage
-				})
-
-		# Also search contacts
-		all_contacts = frappe.get_all(
-			"Contact",
-			fields=["email_id", "first_name", "last_name", "name"]
-		)
-
-		for contact in all_contacts:
-			name = f"{contact.first_name or ''} {contact.last_name or ''}".strip() or contact.name
-			if not name:
-				continue
-
-			similarity = difflib.SequenceMatcher(
-				None,
+		from rapidfuzz import fuzz, process
+
+		self._log.info("🔎 Fuzzy search starting for: '%s'", query)
+
+		directory = get_recipient_directory()
+		query_lower = _fold(query)
+
+		# fuzz.ratio is at most 2 * min(a, b) / (a + b) for strings of lengths a and b,
+		# so names outside 3/7..7/3 of the query length can never reach 60%
+		query_length = len(query_lower)
+		candidates = [
+			index
+			for index, length in enumerate(directory.name_lengths)
+			if 7 * length >= 3 * query_length and 3 * length <= 7 * query_length
+		]
+
+		# Score the remaining precomputed names in one C-level pass per source; results
+		# come back sorted, best matches first. fuzz.ratio is a normalized Indel distance,
+		# not difflib's Ratcliff/Obershelp ratio, so scores (and which names clear the
+		# 60% threshold) can differ slightly from the previous difflib-based suggestions
+		def best_matches(indexes, score_cutoff=60):
+			return process.extract(
 				query_lower,
-				name.lower()
-			).ratio()
-
-			if similarity > 0.6:
-				matches.append({
-					"name": name,
-					"email": contact.email_id,
-					"similarity": round(similarity * 100)
-				})
-
-		# Sort by similarity (best matches first)
-		matches.sort(key=lambda x: x["similarity"], reverse=True)
+				{index: directory.names_lower[index] for index in indexes},
+				scorer=fuzz.ratio,
+				score_cutoff=score_cutoff,
+				limit=3
+			)
 
-		# Return top 3 suggestions
-		top_matches = matches[:3]
+		# Users come first in the directory. Once they fill the top 3, Contacts only need to
+		# reach the weakest of those scores, which lets rapidfuzz skip most of them early;
+		# the top 3 across both sources is unchanged, Users first on equal scores
+		user_count = len(directory.users.entries)
+		split = bisect_left(candidates, user_count)
+		results = best_matches(candidates[:split])
+		contact_cutoff = results[2][1] if len(results) == 3 else 60
+		results = sorted(results + best_matches(candidates[split:], contact_cutoff), key=lambda r: -r[1])[:3]
+
+		top_matches = [
+			{
+				"name": directory.all_entries[index].display_name,
+				"email": directory.all_entries[index].email,
+				"similarity": round(score)  # Already a percentage
+			}
+			for _choice, score, index in results
+			if score > 60
+		]
 
-		frappe.logger("send_email").info(
-			f"💡 Fuzzy search for '{query}': {len(top_matches)} suggestions (from {len(matches)} total)"
+		self._log.info(
+			"💡 Fuzzy search for '%s': %s suggestions (from %s candidates)",
+			query, len(top_matches), len(candidates)
 		)
 
 		return top_matches
@@ -623,16 +1070,56 @@ Exemple 4 - Avec CC/BCC:
 		if not recipients_string:
 			return []
 
-		recipients = [r.strip() for r in recipients_string.split(",")]
-		emails = []
+		# Drop empty entries and repeats, keeping the first occurrence's position
+		recipients = list(dict.fromkeys(r.strip() for r in recipients_string.split(",") if r.strip()))
 
+		# Resolve exact names in one pass over the directory
+		names = [r for r in recipients if not _looks_like_email(r)]
+		resolved = self._resolve_exact_names(names) if names else {}
+
+		emails = []
 		for recipient in recipients:
-			email = self._find_recipient(recipient)
-			if email:
+			# Email addresses need no lookup
+			if _looks_like_email(recipient):
+				emails.append(recipient)
+				continue
+
+			# Fall back to the full search only for names without a unique exact match
+			email = resolved.get(_fold(recipient)) or self._find_recipient(recipient)
+
+			# Ambiguous or unknown names come back as a dict or None
+			if isinstance(email, str):
 				emails.append(email)
 
 		return emails
 
+	def _resolve_exact_names(self, names: List[str]) -> Dict[str, str]:
+		"""
+		Resolve names that exactly match one User, or failing that one Contact.
+
+		Returns:
+			dict: {folded name: email} for the names that resolved
+		"""
+		wanted = {_fold(name) for name in names}
+		directory = get_recipient_directory()
+		resolved = {}
+
+		for index in (directory.users, directory.contacts):
+			matched = set()
+			for key in wanted:
+				emails = index.exact.get(key)
+				if emails:
+					matched.add(key)
+					if len(emails) == 1:
+						resolved[key] = next(iter(emails))
+
+			# Names matching Users are not looked up again in Contacts
+			wanted -= matched
+			if not wanted:
+				break
+
+		return resolved
+
 	def _simple_fallback_improvement(self, message: str, recipient: str, sender_name: str) -> str:
 		"""
 		Simple fallback when LLM-based improvement fails.
@@ -662,16 +1149,12 @@ Exemple 4 - Avec CC/BCC:
 		Takes first line or first 50 characters.
 		"""
 		# Take first line of message
-		first_line = message.split("\n")[0].strip()
-
-		# Remove greeting if present
-		for greeting in ["Bonjour", "Hello", "Hi", "Salut"]:
-			if first_line.startswith(greeting):
-				# Try to get next line
-				lines = message.split("\n")
-				if len(lines) > 2:  # greeting, empty line, content
-					first_line = lines[2].strip()
-				break
+		lines = message.split("\n")
+		first_line = lines[0].strip()
+
+		# Remove greeting if present by using the next paragraph instead
+		if _GREETING_RE.match(first_line) and len(lines) > 2:  # greeting, empty line, content
+			first_line = lines[2].strip()
 
 		# Limit length
 		if len(first_line) > 50:
@@ -681,68 +1164,37 @@ Exemple 4 - Avec CC/BCC:
 
 	def _generate_preview(self, recipient: str, subject: str, content: str, cc: list, bcc: list, sender: str) -> str:
 		"""Generate markdown preview of email"""
-		preview = f"📧 **Aperçu de l'email**\n\n"
-		preview += f"**De:** {sender}\n"
-		preview += f"**À:** {recipient}\n"
+		parts = [
+			"📧 **Aperçu de l'email**\n\n",
+			f"**De:** {sender}\n",
+			f"**À:** {recipient}\n"
+		]
 
 		if cc:
-			preview += f"**CC:** {', '.join(cc)}\n"
+			parts.append(f"**CC:** {', '.join(cc)}\n")
 		if bcc:
-			preview += f"**BCC:** {', '.join(bcc)}\n"
+			parts.append(f"**BCC:** {', '.join(bcc)}\n")
 
-		preview += f"**Objet:** {subject}\n\n"
-		preview += f"**Message:**\n\n"
+		parts.append(f"**Objet:** {subject}\n\n")
+		parts.append("**Message:**\n\n")
 
 		# Quote the message content
-		for line in content.split("\n"):
-			preview += f"> {line}\n"
+		parts.extend(f"> {line}\n" for line in content.split("\n"))
 
-		return preview
+		return "".join(parts)
 
 	def _send_communication(self, communication_id: str) -> Dict[str, Any]:
-		"""Actually send the communication via frappe.sendmail"""
+		"""Queue the communication for delivery by a background worker"""
 		try:
-			comm = frappe.get_doc("Communication", communication_id)
-
-			# Get attachments from Communication if any
-			attachments_list = []
-			if comm.has_attachment:
-				frappe.logger("send_email").info(
-					f"📎 Loading attachments for Communication {comm.name}"
-				)
-				attached_files = frappe.get_all(
-					"File",
-					filters={
-						"attached_to_doctype": "Communication",
-						"attached_to_name": comm.name
-					},
-					fields=["name", "file_name"]
-				)
-				# Format attachments as dicts with 'fid' key (required by frappe.sendmail)
-				attachments_list = [{"fid": f.name} for f in attached_files]
-				frappe.logger("send_email").info(
-					f"📎 Found {len(attachments_list)} attachment(s): {[f['file_name'] for f in attached_files]}"
-				)
-
-			# Send via frappe.sendmail
-			frappe.sendmail(
-				recipients=comm.recipients,
-				cc=comm.cc,
-				bcc=comm.bcc,
-				subject=comm.subject,
-				message=comm.content,
-				attachments=attachments_list if attachments_list else None,
-				reference_doctype="Communication",
-				reference_name=comm.name,
-				now=True
+			# The worker must see the Communication, so enqueue once this transaction commits
+			frappe.enqueue(
+				"frappe_assistant_core.plugins.core.tools.send_email.deliver_communication",
+				queue="short",
+				enqueue_after_commit=True,
+				communication_id=communication_id
 			)
 
-			# Update communication status
-			comm.email_status = "Open"
-			comm.db_update()
-			frappe.db.commit()
-
-			return {"success": True}
+			return {"success": True, "queued": True}
 
 		except Exception as e:
 			return {
@@ -784,14 +1236,14 @@ Exemple 4 - Avec CC/BCC:
 			# Try exact match first
 			if frappe.db.exists(doctype, doc_name):
 				found_doc_name = doc_name
-				frappe.logger("send_email").info(f"✅ Exact match found: {found_doc_name}")
+				self._log.info("✅ Exact match found: %s", found_doc_name)
 			else:
 				# Search for partial match
-				frappe.logger("send_email").info(f"🔍 Searching for documents matching: {doc_name}")
+				self._log.info("🔍 Searching for documents matching: %s", doc_name)
 				matching_docs = frappe.get_all(
 					doctype,
 					filters=[["name", "like", f"%{doc_name}%"]],
-					fields=["name"],
+					pluck="name",
 					limit=10
 				)
 
@@ -803,16 +1255,16 @@ Exemple 4 - Avec CC/BCC:
 
 				if len(matching_docs) > 1:
 					# Multiple matches found - ask user to clarify
-					matches_list = "\n".join([f"  • {doc.name}" for doc in matching_docs])
+					matches_list = "\n".join([f"  • {name}" for name in matching_docs])
 					return {
 						"success": False,
 						"error": f"Multiple {doctype} documents found matching '{doc_name}'",
-						"matches": [doc.name for doc in matching_docs],
+						"matches": matching_docs,
 						"message": f"🤔 Found {len(matching_docs)} {doctype} matching '{doc_name}':\n\n{matches_list}\n\n💡 Please specify the exact document ID."
 					}
 
-				found_doc_name = matching_docs[0].name
-				frappe.logger("send_email").info(f"✅ Found document: {found_doc_name}")
+				found_doc_name = matching_docs[0]
+				self._log.info("✅ Found document: %s", found_doc_name)
 
 			# Check permission on specific document
 			if not frappe.has_permission(doctype, "read", found_doc_name):
@@ -822,7 +1274,7 @@ Exemple 4 - Avec CC/BCC:
 				}
 
 			# Generate PDF - use fallback method to avoid SSL issues
-			frappe.logger("send_email").info(f"📄 Generating PDF for {doctype} {found_doc_name}")
+			self._log.info("📄 Generating PDF for %s %s", doctype, found_doc_name)
 
 			# Get document data
 			doc = frappe.get_doc(doctype, found_doc_name)
@@ -855,8 +1307,7 @@ Exemple 4 - Avec CC/BCC:
 
 			# Add document fields dynamically
 			for key, value in doc.as_dict().items():
-				if key not in ['doctype', 'name', 'owner', 'creation', 'modified', 'modified_by', 'docstatus',
-							   'idx', '_user_tags', '_comments', '_assign', '_liked_by']:
+				if key not in _PDF_SKIPPED_FIELDS:
 					if value and str(value).strip():
 						html += f"<tr><th>{key}</th><td>{value}</td></tr>\n"
 
@@ -875,9 +1326,9 @@ Exemple 4 - Avec CC/BCC:
 					"fname": f"{doctype.replace(' ', '-')}-{found_doc_name}.pdf",
 					"fcontent": pdf_data
 				}
-				frappe.logger("send_email").info(f"✅ PDF generated successfully ({len(pdf_data)} bytes)")
+				self._log.info("✅ PDF generated successfully (%s bytes)", len(pdf_data))
 			except Exception as e:
-				frappe.logger("send_email").error(f"PDF generation failed: {str(e)}")
+				self._log.error("PDF generation failed: %s", e)
 				return {
 					"success": False,
 					"error": f"Failed to generate PDF for {doctype} '{found_doc_name}': {str(e)}"
@@ -894,48 +1345,38 @@ Exemple 4 - Avec CC/BCC:
 			}
 
 		except Exception as e:
-			frappe.logger("send_email").error(f"Error generating PDF: {str(e)}")
+			self._log.error("Error generating PDF: %s", e)
 			return {
 				"success": False,
 				"error": f"Failed to generate PDF for {doctype} '{doc_name}': {str(e)}"
 			}
 
-	def _get_recipient_from_document(self, doctype: str, doc_name: str) -> Dict[str, Any]:
+	def _get_recipient_from_document(self, doctype: str, doc_name: str, doc=None) -> Dict[str, Any]:
 		"""
 		Extract recipient email from document (e.g., customer email from Sales Invoice).
 
 		Args:
 			doctype: Document type
 			doc_name: Document name
+			doc: Optional already loaded document, to avoid fetching it again
 
 		Returns:
 			dict: {"success": bool, "email": str, "error": str}
 		"""
 		try:
-			doc = frappe.get_doc(doctype, doc_name)
-
-			# Common email fields by doctype
-			email_field_map = {
-				"Sales Invoice": ["contact_email", "customer_email"],
-				"Quotation": ["contact_email", "customer_email"],
-				"Sales Order": ["contact_email", "customer_email"],
-				"Delivery Note": ["contact_email", "customer_email"],
-				"Purchase Invoice": ["contact_email", "supplier_email"],
-				"Purchase Order": ["contact_email", "supplier_email"],
-				"Purchase Receipt": ["contact_email", "supplier_email"],
-				"Supplier Quotation": ["contact_email", "supplier_email"],
-			}
+			if doc is None:
+				doc = frappe.get_doc(doctype, doc_name)
 
 			# Get potential email fields for this doctype
-			email_fields = email_field_map.get(doctype, ["contact_email", "email_id", "email"])
+			email_fields = _EMAIL_FIELDS_BY_DOCTYPE.get(doctype, _DEFAULT_EMAIL_FIELDS)
 
 			# Try each field
 			for field in email_fields:
 				if hasattr(doc, field):
 					email = getattr(doc, field)
 					if email and "@" in email:
-						frappe.logger("send_email").info(
-							f"✅ Found recipient email in {doctype}.{field}: {email}"
+						self._log.info(
+							"✅ Found recipient email in %s.%s: %s", doctype, field, email
 						)
 						return {
 							"success": True,
@@ -956,14 +1397,14 @@ Exemple 4 - Avec CC/BCC:
 						"link_name": doc.customer,
 						"parenttype": "Contact"
 					},
-					fields=["parent"],
+					pluck="parent",
 					limit=1
 				)
 				if contacts:
-					contact_email = frappe.db.get_value("Contact", contacts[0].parent, "email_id")
+					contact_email = frappe.db.get_value("Contact", contacts[0], "email_id")
 					if contact_email:
-						frappe.logger("send_email").info(
-							f"✅ Found recipient email from linked Contact: {contact_email}"
+						self._log.info(
+							"✅ Found recipient email from linked Contact: %s", contact_email
 						)
 						return {"success": True, "email": contact_email}
 
@@ -980,14 +1421,14 @@ Exemple 4 - Avec CC/BCC:
 						"link_name": doc.supplier,
 						"parenttype": "Contact"
 					},
-					fields=["parent"],
+					pluck="parent",
 					limit=1
 				)
 				if contacts:
-					contact_email = frappe.db.get_value("Contact", contacts[0].parent, "email_id")
+					contact_email = frappe.db.get_value("Contact", contacts[0], "email_id")
 					if contact_email:
-						frappe.logger("send_email").info(
-							f"✅ Found recipient email from linked Contact: {contact_email}"
+						self._log.info(
+							"✅ Found recipient email from linked Contact: %s", contact_email
 						)
 						return {"success": True, "email": contact_email}
 
@@ -1020,7 +1461,20 @@ Exemple 4 - Avec CC/BCC:
 		Returns:
 			str: Best available name for signature
 		"""
-		user = frappe.get_doc("User", user_email)
+		# Memoized for the current request
+		sender_names = getattr(frappe.local, "_fac_sender_names", None)
+		if sender_names is None:
+			sender_names = frappe.local._fac_sender_names = {}
+		if user_email not in sender_names:
+			sender_names[user_email] = self._build_sender_name(user_email)
+		return sender_names[user_email]
+
+	def _build_sender_name(self, user_email: str) -> str:
+		"""Apply the _get_sender_name fallback chain to the User's name fields"""
+		# The session user's document cache, shared across requests and cleared on User save
+		user = frappe.get_cached_value(
+			"User", user_email, ["full_name", "first_name", "last_name"], as_dict=True
+		) or frappe._dict()
 
 		# Priority 1: full_name
 		if user.full_name and user.full_name.strip():
@@ -19,10 +19,16 @@ Python Code Execution Tool for Data Science Plugin.
 Executes Python code safely in a restricted environment.
 """
 
+import functools
+import importlib.util
 import io
+import re
+import signal
 import sys
+import threading
 import traceback
-from contextlib import redirect_stderr, redirect_stdout
+from contextlib import contextmanager, redirect_stderr, redirect_stdout
+from types import CodeType
 from typing import Any, Dict
 
 import frappe
@@ -30,116 +36,187 @@ from frappe import _
 
 from frappe_assistant_core.core.base_tool import BaseTool
 
+# Data science libraries whose availability is reported in the tool description
+_DATA_LIBRARIES = ("pandas", "numpy", "matplotlib", "seaborn", "plotly", "scipy", "numba")
+
+# Pre-loaded names and module attributes left out of the variables returned to the caller
+_EXCLUDED_VARS = frozenset(
+    {
+        "frappe",
+        "pd",
+        "np",
+        "plt",
+        "sns",
+        "data",
+        "current_user",
+        "db",
+        "get_doc",
+        "get_list",
+        "get_all",
+        "get_single",
+        "math",
+        "datetime",
+        "json",
+        "re",
+        "random",
+        "statistics",
+        "decimal",
+        "fractions",
+        # Pre-loaded libraries that shouldn't appear in response
+        "pandas",
+        "numpy",
+        "matplotlib",
+        "seaborn",
+        "plotly",
+        "scipy",
+        "stats",
+        "go",
+        "px",
+        "numba",
+        "njit",
+        "prange",
+        "__builtins__",
+        "__name__",
+        "__doc__",
+        "__package__",
+        "__loader__",
+        "__spec__",
+        "__annotations__",
+        "__cached__",
+    }
+)
 
-class ExecutePythonCode(BaseTool):
-    """
-    Tool for executing Python code with data science libraries.
-
-    Provides safe execution of Python code with access to:
-    - pandas, numpy, matplotlib, seaborn, plotly
-    - Frappe data access
-    - Result capture and display
-    """
-
-    def __init__(self):
-        super().__init__()
-        self.name = "run_python_code"
-
-        # Check library availability at initialization time
-        self.library_status = self._check_library_availability()
-
-        self.description = self._get_dynamic_description()
-        self.requires_permission = None  # Available to all users
-
-        self.inputSchema = {
-            "type": "object",
-            "properties": {
-                "code": {
-                    "type": "string",
-                    "description": "Python code to execute. IMPORTANT: Do NOT use import statements - all libraries are pre-loaded and ready to use: pd (pandas), np (numpy), plt (matplotlib), sns (seaborn), frappe, math, datetime, json, re, random. Example: df = pd.DataFrame({'A': [1,2,3]}); plt.plot([1,2,3])",
-                },
-                "data_query": {
-                    "type": "object",
-                    "description": "Query to fetch data and make it available as 'data' variable",
-                    "properties": {
-                        "doctype": {"type": "string"},
-                        "fields": {"type": "array", "items": {"type": "string"}},
-                        "filters": {"type": "object"},
-                        "limit": {"type": "integer", "default": 100},
-                    },
-                },
-                "timeout": {
-                    "type": "integer",
-                    "description": "Execution timeout in seconds (default: 30)",
-                    "default": 30,
-                    "minimum": 1,
-                    "maximum": 300,
-                },
-                "capture_output": {
-                    "type": "boolean",
-                    "description": "Whether to capture print output (default: true)",
-                    "default": True,
-                },
-                "return_variables": {
-                    "type": "array",
-                    "description": "Variable names to return values for",
-                    "items": {"type": "string"},
-                },
-            },
-            "required": ["code"],
-        }
-
-    def _check_library_availability(self) -> Dict[str, bool]:
-        """Check which data science libraries are available at initialization"""
-        libraries = {}
-
-        try:
-            import pandas
-
-            libraries["pandas"] = True
-        except ImportError:
-            libraries["pandas"] = False
-
-        try:
-            import numpy
-
-            libraries["numpy"] = True
-        except ImportError:
-            libraries["numpy"] = False
-
-        try:
-            import matplotlib
-
-            libraries["matplotlib"] = True
-        except ImportError:
-            libraries["matplotlib"] = False
-
-        try:
-            import seaborn
-
-            libraries["seaborn"] = True
-        except ImportError:
-            libraries["seaborn"] = False
-
-        try:
-            import plotly
-
-            libraries["plotly"] = True
-        except ImportError:
-            libraries["plotly"] = False
-
-        try:
-            import scipy
-
-            libraries["scipy"] = True
-        except ImportError:
-            libraries["scipy"] = False
-
-        return libraries
+# Types _serialize_variable returns unchanged (exact types; subclasses such as numpy scalars are not)
+_PLAIN_TYPES = frozenset({str, int, float, bool, list, dict, tuple})
+
+# Unicode surrogates (U+D800-U+DFFF), which cannot be encoded as UTF-8, and their replacement by spaces
+_SURROGATE_RE = re.compile("[\ud800-\udfff]")
+_SURROGATE_TABLE = dict.fromkeys(range(0xD800, 0xE000), " ")
+
+# Patterns used by _preprocess_code_for_common_errors, compiled once at import
+# df = df.append(...)
+_APPEND_RE = re.compile(r"(\w+)\s*=\s*\1\.append\s*\(([^)]+)\)")
+# pd.concat([...]) with no further arguments
+_CONCAT_RE = re.compile(r"pd\.concat\s*\(\s*\[([^\]]+)\]\s*\)")
+# df.sort_values(..., inplace=True) and similar in-place calls
+_INPLACE_RE = re.compile(
+    r"(\w+)\.(sort_values|drop_duplicates|fillna|reset_index)\(([^)]*inplace\s*=\s*True[^)]*)\)"
+)
+# The inplace=True argument itself, with its separating comma
+_INPLACE_ARG_RE = re.compile(r",?\s*inplace\s*=\s*True,?")
+# Chained assignment: df['col'][0] = value
+_CHAINED_INDEX_RE = re.compile(r'\w+\[["\'][^"\']+["\']\]\[\d+\]\s*=')
+# df2 = df[...] not followed by a method call
+_SLICE_RE = re.compile(r"(\w+)\s*=\s*(\w+)\[([^\]]+)\](?!\s*\.)")
+
+# Patterns used by _scan_for_dangerous_operations, compiled once at import
+# Operations that reject the code, with the reason reported to the user
+_DANGEROUS_PATTERNS = tuple(
+    (re.compile(pattern, re.IGNORECASE | re.MULTILINE), message)
+    for pattern, message in [
+        # Database security patterns
+        (
+            r'db\.sql\s*\(\s*[\'"](?:DELETE|DROP|INSERT|UPDATE|ALTER|CREATE|TRUNCATE|REPLACE)',
+            "Dangerous SQL operation detected in db.sql()",
+        ),
+        (
+            r'frappe\.db\.sql\s*\(\s*[\'"](?:DELETE|DROP|INSERT|UPDATE|ALTER|CREATE|TRUNCATE|REPLACE)',
+            "Dangerous SQL operation detected in frappe.db.sql()",
+        ),
+        # Python security patterns
+        (r"\bexec\s*\(", "Code execution via exec() not allowed"),
+        (r"\beval\s*\(", "Code evaluation via eval() not allowed"),
+        (r"__import__\s*\(", "Dynamic imports via __import__() not allowed"),
+        (r"compile\s*\(", "Code compilation not allowed"),
+        # Frappe framework modification patterns
+        (r"setattr\s*\(\s*frappe", "Frappe framework modification not allowed"),
+        (r"delattr\s*\(\s*frappe", "Frappe framework modification not allowed"),
+        (r"frappe\.local\s*\.\s*\w+\s*=", "Frappe local context modification not allowed"),
+        (r"frappe\.session\s*\.\s*\w+\s*=", "Frappe session modification not allowed"),
+        # File system access patterns (additional security)
+        (r"open\s*\(", "File system access not allowed"),
+        (r"file\s*\(", "File system access not allowed"),
+        (r"input\s*\(", "User input not allowed in code execution"),
+        (r"raw_input\s*\(", "User input not allowed in code execution"),
+        # Dangerous database method patterns
+        (r"db\.set_value\s*\(", "Database write operation db.set_value() not allowed"),
+        (r"db\.delete\s*\(", "Database delete operation not allowed"),
+        (r"db\.insert\s*\(", "Database insert operation not allowed"),
+        (r"db\.truncate\s*\(", "Database truncate operation not allowed"),
+        # Network access patterns
+        (r"urllib", "Network access not allowed"),
+        (r"requests", "Network access not allowed"),
+        (r"socket", "Network access not allowed"),
+        (r"http", "Network access not allowed"),
+    ]
+)
+# All dangerous patterns as one alternation, so clean code is scanned in a single pass
+_DANGEROUS_UNION = re.compile(
+    "|".join(f"(?:{pattern.pattern})" for pattern, _message in _DANGEROUS_PATTERNS),
+    re.IGNORECASE | re.MULTILINE,
+)
+# Variable names that might indicate attempts to bypass security (logged only)
+_SUSPICIOUS_VAR_PATTERNS = tuple(
+    re.compile(pattern, re.IGNORECASE)
+    for pattern in [
+        r"\b_[a-zA-Z0-9_]*db[a-zA-Z0-9_]*\b",  # Variables like _db, _original_db
+        r"\boriginal_[a-zA-Z0-9_]*\b",  # Variables like original_frappe
+        r"\b__[a-zA-Z0-9_]+__\b",  # Dunder variables
+    ]
+)
+# SQL injection patterns in string literals (logged only)
+_SQL_INJECTION_PATTERNS = tuple(
+    re.compile(pattern, re.IGNORECASE)
+    for pattern in [
+        r'[\'"].*(?:union|select|insert|delete|update|drop).*[\'"]',
+        r'[\'"].*;.*[\'"]',  # SQL statement terminators
+    ]
+)
 
-    def _get_dynamic_description(self) -> str:
-        """Generate description based on current streaming settings and library availability"""
-        base_description = """Execute custom Python code for advanced analysis and complex calculations.
+# Imports that _check_and_handle_imports replaces by a comment (exact matches)
+_SAFE_IMPORT_REPLACEMENTS = {
+    "import pandas as pd": '# pandas is pre-loaded as "pd"',
+    "import numpy as np": '# numpy is pre-loaded as "np"',
+    "import matplotlib.pyplot as plt": '# matplotlib is pre-loaded as "plt"',
+    "import seaborn as sns": '# seaborn is pre-loaded as "sns"',
+    "import frappe": "# frappe is pre-loaded",
+    "import math": "# math is pre-loaded",
+    "import datetime": "# datetime is pre-loaded",
+    "import json": "# json is pre-loaded",
+    "import re": "# re is pre-loaded",
+    "import random": "# random is pre-loaded",
+    "import statistics": "# statistics is pre-loaded",
+    "import decimal": "# decimal is pre-loaded",
+    "import fractions": "# fractions is pre-loaded",
+    # Allow these common stdlib imports
+    "import collections": "# collections allowed - Counter, defaultdict, etc.",
+    "import itertools": "# itertools allowed - combinatoric iterators",
+    "import functools": "# functools allowed - higher-order functions",
+    "import operator": "# operator allowed - standard operators",
+    "import copy": "# copy allowed - shallow and deep copy",
+    "import string": "# string allowed - string operations",
+}
+
+# Safe import prefixes (for partial matches)
+_SAFE_IMPORT_PREFIXES = {
+    "from datetime import": "# datetime is pre-loaded",
+    "from math import": "# math is pre-loaded",
+    "from collections import": "# collections allowed",
+    "from itertools import": "# itertools allowed",
+    "from functools import": "# functools allowed",
+    "from operator import": "# operator allowed",
+}
+
+
+@functools.lru_cache(maxsize=256)
+def _compile_user_code(code: str) -> CodeType:
+    """Compile code for exec(), reusing the code object when the same source runs again"""
+    # Same filename as exec() on a string, so tracebacks are unchanged
+    return compile(code, "<string>", "exec")
+
+
+# Tool description before library warnings and the streaming suffix
+_BASE_DESCRIPTION = """Execute custom Python code for advanced analysis and complex calculations.
 
 CRITICAL: For ANY query requiring data fetching + analysis, use the 'tools' API INSIDE your Python code to fetch data. DO NOT call separate tools (like list_documents) and then manually copy data into code - this wastes tokens and is inefficient.
 
@@ -335,19 +412,169 @@ All tools methods maintain:
 No internal directory structure or import paths exposed.
 Use tools API directly - no imports needed."""
 
-        # Add library availability warnings
-        library_warnings = []
-        if not self.library_status.get("pandas"):
-            library_warnings.append(
-                "⚠️  pandas NOT available - use tools.generate_report() or frappe.get_all() instead"
-            )
-        if not self.library_status.get("numpy"):
-            library_warnings.append("⚠️  numpy NOT available - use math/statistics modules")
-        if not self.library_status.get("matplotlib"):
-            library_warnings.append("⚠️  matplotlib NOT available - visualization not supported")
 
-        if library_warnings:
-            base_description += "\n\n" + "\n".join(library_warnings)
+class _ExecutionTimeout(BaseException):
+    """
+    Raised into user code by _time_limit. Derives from BaseException so snippets with
+    `except Exception:` cannot swallow it; _execute_code_with_timeout reports it.
+    """
+
+
+@contextmanager
+def _time_limit(seconds: float):
+    """
+    Raise _ExecutionTimeout in the running code once `seconds` have elapsed.
+
+    Uses a SIGALRM interval timer, so it only applies on POSIX in the main thread, and
+    not when a timer is already armed (e.g. an RQ job timeout, whose deadline then governs).
+    """
+    if (
+        not seconds
+        or not hasattr(signal, "setitimer")
+        or threading.current_thread() is not threading.main_thread()
+        or signal.getitimer(signal.ITIMER_REAL)[0]
+    ):
+        yield
+        return
+
+    def raise_timeout(signum, frame):
+        raise _ExecutionTimeout(f"Code execution exceeded the {seconds}s timeout")
+
+    previous_handler = signal.signal(signal.SIGALRM, raise_timeout)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous_handler)
+
+
+# Characters of stdout/stderr kept per execution; the rest is counted but dropped
+_MAX_CAPTURED_CHARS = 256 * 1024
+
+
+class _OutputCapture(io.TextIOBase):
+    """Text stream collecting up to _MAX_CAPTURED_CHARS in a list, joined once by getvalue()"""
+
+    def __init__(self):
+        super().__init__()
+        self._parts = []
+        self._room = _MAX_CAPTURED_CHARS
+        self._dropped = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, text: str) -> int:
+        size = len(text)
+        if size <= self._room:
+            self._parts.append(text)
+            self._room -= size
+        else:
+            # Keep what still fits so the output ends where the limit was reached
+            if self._room:
+                self._parts.append(text[: self._room])
+            self._dropped += size - self._room
+            self._room = 0
+        return size
+
+    def getvalue(self) -> str:
+        value = "".join(self._parts)
+        if self._dropped:
+            value += f"\n... [{self._dropped} chars truncated]"
+        return value
+
+
+class ExecutePythonCode(BaseTool):
+    """
+    Tool for executing Python code with data science libraries.
+
+    Provides safe execution of Python code with access to:
+    - pandas, numpy, matplotlib, seaborn, plotly
+    - Frappe data access
+    - Result capture and display
+    """
+
+    # Tool input schema, shared by all instances
+    INPUT_SCHEMA = {
+        "type": "object",
+        "properties": {
+            "code": {
+                "type": "string",
+                "description": "Python code to execute. IMPORTANT: Do NOT use import statements - all libraries are pre-loaded and ready to use: pd (pandas), np (numpy), plt (matplotlib), sns (seaborn), frappe, math, datetime, json, re, random. Example: df = pd.DataFrame({'A': [1,2,3]}); plt.plot([1,2,3])",
+            },
+            "data_query": {
+                "type": "object",
+                "description": "Query to fetch data and make it available as 'data' variable",
+                "properties": {
+                    "doctype": {"type": "string"},
+                    "fields": {"type": "array", "items": {"type": "string"}},
+                    "filters": {"type": "object"},
+                    "limit": {"type": "integer", "default": 100},
+                },
+            },
+            "timeout": {
+                "type": "integer",
+                "description": "Execution timeout in seconds (default: 30)",
+                "default": 30,
+                "minimum": 1,
+                "maximum": 300,
+            },
+            "capture_output": {
+                "type": "boolean",
+                "description": "Whether to capture print output (default: true)",
+                "default": True,
+            },
+            "return_variables": {
+                "type": "array",
+                "description": "Variable names to return values for (default: all user-defined variables)",
+                "items": {"type": "string"},
+            },
+        },
+        "required": ["code"],
+    }
+
+    # {library name: installed}, shared by all instances; see _check_library_availability
+    _library_status = None
+
+    # Description without the streaming suffix; see _get_base_description
+    _base_description = None
+
+    # Execution environment shared by all runs; see _get_base_environment
+    _base_environment = None
+
+    # _EXCLUDED_VARS plus the sandbox built-ins, left out of the returned variables
+    _hidden_names = frozenset()
+
+    def __init__(self):
+        super().__init__()
+        self.name = "run_python_code"
+
+        # Security warnings and execution errors are monitored in execute_python_code.log,
+        # so log them there rather than to the module-named self.logger; acquired once
+        self._exec_logger = frappe.logger("execute_python_code")
+
+        # Check library availability at initialization time
+        self.library_status = self._check_library_availability()
+
+        self.description = self._get_dynamic_description()
+        self.requires_permission = None  # Available to all users
+
+        self.inputSchema = self.INPUT_SCHEMA
+
+    @classmethod
+    def _check_library_availability(cls) -> Dict[str, bool]:
+        """Check which data science libraries are installed, once per process"""
+        if cls._library_status is None:
+            # find_spec locates a module without importing it (matplotlib and plotly are slow to import)
+            cls._library_status = {
+                name: importlib.util.find_spec(name) is not None for name in _DATA_LIBRARIES
+            }
+        return cls._library_status
+
+    def _get_dynamic_description(self) -> str:
+        """Generate description based on current streaming settings and library availability"""
+        base_description = self._get_base_description()
 
         try:
             from frappe_assistant_core.utils.streaming_manager import get_streaming_manager
@@ -357,9 +584,46 @@ Use tools API directly - no imports needed."""
             return base_description + streaming_suffix
 
         except Exception as e:
-            frappe.logger("execute_python_code").warning(f"Failed to load streaming configuration: {str(e)}")
+            self._exec_logger.warning(f"Failed to load streaming configuration: {str(e)}")
             return base_description
 
+    @classmethod
+    def _get_base_description(cls) -> str:
+        """
+        Description without the streaming suffix, built once per process.
+
+        It only depends on library availability; the streaming suffix follows the
+        settings cached by the streaming manager, so it is appended per instance.
+        """
+        if cls._base_description is not None:
+            return cls._base_description
+
+        library_status = cls._check_library_availability()
+
+        # Add library availability warnings
+        library_warnings = []
+        if not library_status.get("pandas"):
+            library_warnings.append(
+                "⚠️  pandas NOT available - use tools.generate_report() or frappe.get_all() instead"
+            )
+        if not library_status.get("numpy"):
+            library_warnings.append("⚠️  numpy NOT available - use math/statistics modules")
+        if not library_status.get("matplotlib"):
+            library_warnings.append("⚠️  matplotlib NOT available - visualization not supported")
+
+        base_description = _BASE_DESCRIPTION
+        if library_status.get("numba"):
+            # Code runs from "<string>", so numba's on-disk cache (cache=True) cannot be used
+            base_description += (
+                "\n\n⚡ numba available: njit and prange are pre-loaded for hot numeric loops, e.g.\n"
+                "@njit\ndef sum_sq(a):\n    s = 0.0\n    for x in a:\n        s += x * x\n    return s"
+            )
+        if library_warnings:
+            base_description = "\n\n".join([base_description, "\n".join(library_warnings)])
+
+        cls._base_description = base_description
+        return base_description
+
     def execute(self, arguments: Dict[str, Any]) -> Dict[str, Any]:
         """Execute Python code safely with secure user context and read-only database"""
         code = arguments.get("code", "")
@@ -381,19 +645,18 @@ Use tools API directly - no imports needed."""
                     # Perform security scan before execution
                     security_check = self._scan_for_dangerous_operations(code)
                     if not security_check["success"]:
-                        frappe.logger().warning(
+                        self._exec_logger.warning(
                             f"Security violation in code execution - User: {current_user}, "
                             f"Pattern: {security_check.get('pattern_matched', 'unknown')}"
                         )
                         return security_check
 
-                    # Check for import statements and provide helpful error
+                    # Check for import statements and provide helpful error; on success every
+                    # import line has been replaced by a comment, so none reach exec()
                     import_check_result = self._check_and_handle_imports(code)
                     if not import_check_result["success"]:
                         return import_check_result
-
-                    # Remove dangerous imports for additional security
-                    code = self._remove_dangerous_imports(import_check_result["code"])
+                    code = import_check_result["code"]
 
                     # Sanitize Unicode characters to prevent encoding errors
                     unicode_check_result = self._sanitize_unicode(code)
@@ -439,7 +702,7 @@ Use tools API directly - no imports needed."""
         except frappe.PermissionError as e:
             return {"success": False, "error": str(e), "output": "", "variables": {}, "security_error": True}
         except Exception as e:
-            frappe.logger().error(f"Code execution error: {str(e)}")
+            self._exec_logger.error(f"Code execution error: {str(e)}")
             return {"success": False, "error": f"Execution failed: {str(e)}", "output": "", "variables": {}}
 
     def _execute_code_with_timeout(
@@ -461,13 +724,13 @@ Use tools API directly - no imports needed."""
 
         try:
             if capture_output:
-                stdout_capture = io.StringIO()
-                stderr_capture = io.StringIO()
+                stdout_capture = _OutputCapture()
+                stderr_capture = _OutputCapture()
 
-                with redirect_stdout(stdout_capture), redirect_stderr(stderr_capture):
+                with redirect_stdout(stdout_capture), redirect_stderr(stderr_capture), _time_limit(timeout):
                     # Execute code with user context preserved and Unicode handling
                     try:
-                        exec(code, execution_globals)
+                        exec(_compile_user_code(code), execution_globals)
                     except UnicodeEncodeError as unicode_error:
                         # Handle Unicode encoding errors during execution
                         raise UnicodeEncodeError(
@@ -484,71 +747,32 @@ Use tools API directly - no imports needed."""
                 error = stderr_capture.getvalue()
             else:
                 # Execute without capturing output
-                exec(code, execution_globals)
-
-            # Extract all user-defined variables (not built-ins or system variables)
-            excluded_vars = {
-                "frappe",
-                "pd",
-                "np",
-                "plt",
-                "sns",
-                "data",
-                "current_user",
-                "db",
-                "get_doc",
-                "get_list",
-                "get_all",
-                "get_single",
-                "math",
-                "datetime",
-                "json",
-                "re",
-                "random",
-                "statistics",
-                "decimal",
-                "fractions",
-                # Pre-loaded libraries that shouldn't appear in response
-                "pandas",
-                "numpy",
-                "matplotlib",
-                "seaborn",
-                "plotly",
-                "scipy",
-                "stats",
-                "go",
-                "px",
-                "__builtins__",
-                "__name__",
-                "__doc__",
-                "__package__",
-                "__loader__",
-                "__spec__",
-                "__annotations__",
-                "__cached__",
-            }
-
-            for var_name, var_value in execution_globals.items():
-                if (
-                    not var_name.startswith("_")
-                    and var_name not in excluded_vars
-                    and var_name not in execution_globals.get("__builtins__", {})
-                ):
-                    try:
-                        # Try to serialize the variable
-                        variables[var_name] = self._serialize_variable(var_value)
-                    except Exception as e:
-                        variables[var_name] = f"<Could not serialize: {str(e)}>"
+                with _time_limit(timeout):
+                    exec(_compile_user_code(code), execution_globals)
 
-            # Also extract specifically requested variables
             if return_variables:
-                for var_name in return_variables:
-                    if var_name in execution_globals and var_name not in variables:
-                        try:
-                            var_value = execution_globals[var_name]
-                            variables[var_name] = self._serialize_variable(var_value)
-                        except Exception as e:
-                            variables[var_name] = f"<Could not serialize: {str(e)}>"
+                # Only the requested variables, so large unrequested DataFrames are not serialized
+                var_names = [name for name in return_variables if name in execution_globals]
+            else:
+                # All user-defined variables (not built-ins or system variables)
+                hidden_names = self._hidden_names
+                var_names = [
+                    name
+                    for name in execution_globals
+                    if name not in hidden_names and not name.startswith("_")
+                ]
+
+            for var_name in var_names:
+                var_value = execution_globals[var_name]
+                # Plain values are returned as-is, without the serializer's checks
+                if type(var_value) in _PLAIN_TYPES:
+                    variables[var_name] = var_value
+                    continue
+                try:
+                    # Try to serialize the variable
+                    variables[var_name] = self._serialize_variable(var_value)
+                except Exception as e:
+                    variables[var_name] = f"<Could not serialize: {str(e)}>"
 
             result = {
                 "success": True,
@@ -566,6 +790,24 @@ Use tools API directly - no imports needed."""
 
             return result
 
+        except _ExecutionTimeout as timeout_error:
+            # Reported as the builtin TimeoutError; user code could not catch the private type
+            error_msg = f"TimeoutError: {timeout_error}"
+            self._exec_logger.warning(f"Python execution timed out for user {current_user}: {error_msg}")
+
+            return {
+                "success": False,
+                "error": error_msg,
+                "output": output,
+                "variables": {},
+                "user_context": current_user,
+                "timeout": True,
+                "execution_info": {
+                    "execution_id": audit_info.get("execution_id"),
+                    "executed_by": current_user,
+                },
+            }
+
         except UnicodeEncodeError as unicode_error:
             error_msg = (
                 f"🚫 Unicode Error: Code contains characters that cannot be encoded in UTF-8. "
@@ -573,7 +815,7 @@ Use tools API directly - no imports needed."""
                 f"cannot be processed. Please remove or replace non-standard Unicode characters."
             )
 
-            self.logger.error(f"Unicode encoding error for user {current_user}: {error_msg}")
+            self._exec_logger.error(f"Unicode encoding error for user {current_user}: {error_msg}")
 
             return {
                 "success": False,
@@ -593,7 +835,7 @@ Use tools API directly - no imports needed."""
             error_msg = str(e)
             error_traceback = traceback.format_exc()
 
-            self.logger.error(f"Python execution error for user {current_user}: {error_msg}")
+            self._exec_logger.error(f"Python execution error for user {current_user}: {error_msg}")
 
             # Use enhanced error messages with context
             if "surrogates not allowed" in error_msg or "UnicodeEncodeError" in error_msg:
@@ -637,28 +879,26 @@ Use tools API directly - no imports needed."""
                     "executed_by": current_user,
                 }
 
-            self.logger.error(f"Python execution error: {error_msg}")
+            self._exec_logger.error(f"Python execution error: {error_msg}")
             return result
 
     def _preprocess_code_for_common_errors(self, code: str) -> Dict[str, Any]:
         """Auto-fix common pandas/numpy errors before execution"""
-        import re
-
         fixes_applied = []
         original_code = code
 
+        # Each fix is gated on a literal its pattern requires, so code without it skips the regex scan
+
         # Fix 1: Replace deprecated df.append() with pd.concat()
         # Pattern: df = df.append(...) -> df = pd.concat([df, ...], ignore_index=True)
-        append_pattern = r"(\w+)\s*=\s*\1\.append\s*\(([^)]+)\)"
-        if re.search(append_pattern, code):
-            code = re.sub(append_pattern, r"\1 = pd.concat([\1, \2], ignore_index=True)", code)
+        if ".append" in code and _APPEND_RE.search(code):
+            code = _APPEND_RE.sub(r"\1 = pd.concat([\1, \2], ignore_index=True)", code)
             if code != original_code:
                 fixes_applied.append("✓ Replaced deprecated df.append() with pd.concat()")
                 original_code = code
 
         # Fix 2: Add ignore_index=True to pd.concat if missing
-        concat_pattern = r"pd\.concat\s*\(\s*\[([^\]]+)\]\s*\)"
-        concat_matches = re.finditer(concat_pattern, code)
+        concat_matches = _CONCAT_RE.finditer(code) if "pd.concat" in code else ()
         for match in concat_matches:
             full_match = match.group(0)
             if "ignore_index" not in full_match:
@@ -672,21 +912,18 @@ Use tools API directly - no imports needed."""
 
         # Fix 3: Replace inplace=True with explicit assignment (safer)
         # Pattern: df.sort_values(..., inplace=True) -> df = df.sort_values(...)
-        inplace_pattern = (
-            r"(\w+)\.(sort_values|drop_duplicates|fillna|reset_index)\(([^)]*inplace\s*=\s*True[^)]*)\)"
-        )
-        if re.search(inplace_pattern, code):
+        if "inplace" in code and _INPLACE_RE.search(code):
 
             def replace_inplace(match):
                 var_name = match.group(1)
                 method_name = match.group(2)
                 args = match.group(3)
                 # Remove inplace=True from args
-                args_clean = re.sub(r",?\s*inplace\s*=\s*True,?", "", args)
+                args_clean = _INPLACE_ARG_RE.sub("", args)
                 args_clean = args_clean.strip(", ")
                 return f"{var_name} = {var_name}.{method_name}({args_clean})"
 
-            new_code = re.sub(inplace_pattern, replace_inplace, code)
+            new_code = _INPLACE_RE.sub(replace_inplace, code)
             if new_code != code:
                 code = new_code
                 fixes_applied.append("✓ Replaced inplace=True with explicit assignment (safer)")
@@ -694,7 +931,7 @@ Use tools API directly - no imports needed."""
 
         # Fix 4: Fix chained indexing df['col'][0] = value -> df.loc[0, 'col'] = value
         # This is complex and risky, so only warn in comments
-        if re.search(r'\w+\[["\'][^"\']+["\']\]\[\d+\]\s*=', code):
+        if "][" in code and _CHAINED_INDEX_RE.search(code):
             # Add a warning comment at the top
             warning = "# Warning: Chained indexing detected - consider using .loc[] instead\n"
             if not code.startswith(warning):
@@ -703,163 +940,55 @@ Use tools API directly - no imports needed."""
 
         # Fix 5: Auto-add .copy() when slicing DataFrames to avoid SettingWithCopyWarning
         # Pattern: df2 = df[...] -> df2 = df[...].copy()
-        slice_pattern = r"(\w+)\s*=\s*(\w+)\[([^\]]+)\](?!\s*\.)"
-        if re.search(slice_pattern, code):
+        if "[" in code and "=" in code and _SLICE_RE.search(code):
             # Only apply if it looks like a DataFrame slice (not dict or list access)
             def add_copy(match):
                 if "pd.DataFrame" in code or "data" in match.group(2):
                     return f"{match.group(1)} = {match.group(2)}[{match.group(3)}].copy()"
                 return match.group(0)
 
-            new_code = re.sub(slice_pattern, add_copy, code)
+            new_code = _SLICE_RE.sub(add_copy, code)
             if new_code != code:
                 code = new_code
                 fixes_applied.append("✓ Added .copy() to DataFrame slices to avoid SettingWithCopyWarning")
 
         return {"success": True, "code": code, "fixes_applied": fixes_applied}
 
-    def _sanitize_unicode(self, code: str) -> Dict[str, Any]:
-        """Sanitize Unicode characters to prevent encoding errors"""
-        try:
-            # Check if the string contains surrogate characters
-            if any(0xD800 <= ord(char) <= 0xDFFF for char in code if isinstance(char, str)):
-                # Found surrogate characters - clean them
-                cleaned_chars = []
-                surrogate_count = 0
-
-                for char in code:
-                    char_code = ord(char)
-                    if 0xD800 <= char_code <= 0xDFFF:
-                        # Replace surrogate with a space or remove it
-                        cleaned_chars.append(" ")
-                        surrogate_count += 1
-                    else:
-                        cleaned_chars.append(char)
-
-                cleaned_code = "".join(cleaned_chars)
-
-                # Provide a helpful warning
-                warning_msg = f"⚠️  Code contained {surrogate_count} invalid Unicode surrogate character(s) that were replaced with spaces. This often happens when copying code from certain documents or web pages."
-
-                return {"success": True, "code": cleaned_code, "warning": warning_msg}
-
-            # Try encoding to UTF-8 to catch other encoding issues
-            try:
-                code.encode("utf-8")
-            except UnicodeEncodeError as e:
-                # Handle other encoding errors
-                cleaned_code = code.encode("utf-8", errors="replace").decode("utf-8")
-                return {
-                    "success": True,
-                    "code": cleaned_code,
-                    "warning": f"⚠️  Code contained invalid Unicode characters that were replaced. Original error: {str(e)}",
-                }
-
-            # Code is clean
-            return {"success": True, "code": code}
-
-        except Exception as e:
-            return {
-                "success": False,
-                "error": f"Error sanitizing Unicode in code: {str(e)}",
-                "output": "",
-                "variables": {},
-            }
-
     def _check_and_handle_imports(self, code: str) -> Dict[str, Any]:
         """Check for import statements and provide helpful guidance"""
-        import re
+        # Every import line contains one of these, so code without them has nothing to check
+        if "import " not in code and "from " not in code:
+            return {"success": True, "code": code}
 
         lines = code.split("\n")
-        import_lines = []
+        problematic_imports = []
         processed_lines = []
 
-        # Common import patterns that can be safely removed (exact matches)
-        safe_replacements = {
-            "import pandas as pd": '# pandas is pre-loaded as "pd"',
-            "import numpy as np": '# numpy is pre-loaded as "np"',
-            "import matplotlib.pyplot as plt": '# matplotlib is pre-loaded as "plt"',
-            "import seaborn as sns": '# seaborn is pre-loaded as "sns"',
-            "import frappe": "# frappe is pre-loaded",
-            "import math": "# math is pre-loaded",
-            "import datetime": "# datetime is pre-loaded",
-            "import json": "# json is pre-loaded",
-            "import re": "# re is pre-loaded",
-            "import random": "# random is pre-loaded",
-            "import statistics": "# statistics is pre-loaded",
-            "import decimal": "# decimal is pre-loaded",
-            "import fractions": "# fractions is pre-loaded",
-            # Allow these common stdlib imports
-            "import collections": "# collections allowed - Counter, defaultdict, etc.",
-            "import itertools": "# itertools allowed - combinatoric iterators",
-            "import functools": "# functools allowed - higher-order functions",
-            "import operator": "# operator allowed - standard operators",
-            "import copy": "# copy allowed - shallow and deep copy",
-            "import string": "# string allowed - string operations",
-        }
-
-        # Safe import prefixes (for partial matches)
-        safe_prefixes = {
-            "from datetime import": "# datetime is pre-loaded",
-            "from math import": "# math is pre-loaded",
-            "from collections import": "# collections allowed",
-            "from itertools import": "# itertools allowed",
-            "from functools import": "# functools allowed",
-            "from operator import": "# operator allowed",
-        }
-
         for i, line in enumerate(lines):
             stripped_line = line.strip()
 
             # Check if this is an import statement
-            if stripped_line.startswith("import ") or stripped_line.startswith("from "):
-                import_lines.append((i + 1, stripped_line))
-
-                # Try to replace with helpful comment
-                replaced = False
-
-                # Check exact matches first
-                if stripped_line in safe_replacements:
-                    processed_lines.append(line.replace(stripped_line, safe_replacements[stripped_line]))
-                    replaced = True
-                else:
-                    # Check prefix matches
-                    for prefix, replacement in safe_prefixes.items():
+            if stripped_line.startswith(("import ", "from ")):
+                # Check exact matches first, then prefix matches
+                replacement = _SAFE_IMPORT_REPLACEMENTS.get(stripped_line)
+                if replacement is None:
+                    for prefix, prefix_replacement in _SAFE_IMPORT_PREFIXES.items():
                         if stripped_line.startswith(prefix):
-                            processed_lines.append(line.replace(stripped_line, replacement))
-                            replaced = True
+                            replacement = prefix_replacement
                             break
 
-                if not replaced:
-                    # Unknown import - provide helpful error
-                    processed_lines.append(
-                        f"# REMOVED: {stripped_line} - library not available or not needed"
-                    )
+                if replacement is not None:
+                    # Replace with helpful comment
+                    processed_lines.append(line.replace(stripped_line, replacement))
+                else:
+                    # Unknown import - reported below with helpful guidance
+                    problematic_imports.append((i + 1, stripped_line))
             else:
                 processed_lines.append(line)
 
         # If we found problematic imports, provide helpful guidance
-        if import_lines:
-            # Check if they're all safe imports that we can handle
-            problematic_imports = []
-            for line_num, import_stmt in import_lines:
-                is_safe = False
-
-                # Check exact matches
-                if import_stmt in safe_replacements:
-                    is_safe = True
-                else:
-                    # Check prefix matches
-                    for prefix in safe_prefixes.keys():
-                        if import_stmt.startswith(prefix):
-                            is_safe = True
-                            break
-
-                if not is_safe:
-                    problematic_imports.append((line_num, import_stmt))
-
-            if problematic_imports:
-                error_msg = f"""Import statements detected that are not available or needed:
+        if problematic_imports:
+            error_msg = f"""Import statements detected that are not available or needed:
 
 ❌ Problematic imports found:
 {chr(10).join(f"   Line {line_num}: {stmt}" for line_num, stmt in problematic_imports)}
@@ -878,121 +1007,10 @@ Use tools API directly - no imports needed."""
    plt.plot(arr)
    plt.show()"""
 
-                return {"success": False, "error": error_msg, "output": "", "variables": {}}
+            return {"success": False, "error": error_msg, "output": "", "variables": {}}
 
         return {"success": True, "code": "\n".join(processed_lines)}
 
-    def _remove_dangerous_imports(self, code: str) -> str:
-        """Remove dangerous import statements for security, but allow safe ones"""
-        import re
-
-        # Define safe modules that are allowed (expanded for more functionality)
-        safe_modules = {
-            # Mathematical and numeric modules
-            "math",
-            "statistics",
-            "decimal",
-            "fractions",
-            "cmath",  # Complex math
-            # Date/time modules
-            "datetime",
-            "time",
-            "calendar",
-            # Text and data processing
-            "json",
-            "re",
-            "string",
-            "textwrap",
-            "unicodedata",
-            # Data structures and algorithms
-            "collections",  # Counter, defaultdict, OrderedDict, etc.
-            "itertools",  # Combinatoric iterators
-            "functools",  # Higher-order functions
-            "operator",  # Standard operators as functions
-            "heapq",  # Heap queue algorithm
-            "bisect",  # Array bisection algorithm
-            "array",  # Efficient arrays of numeric values
-            "copy",  # Shallow and deep copy operations
-            # Randomization
-            "random",
-            "secrets",  # Cryptographically strong random numbers
-            # Data science libraries
-            "pandas",
-            "numpy",
-            "matplotlib",
-            "seaborn",
-            "plotly",
-            "scipy",
-            # Short aliases
-            "pd",
-            "np",
-            "plt",
-            "sns",
-            "go",
-            "px",
-            "stats",
-        }
-
-        # Define dangerous modules to block
-        dangerous_modules = {
-            "os",
-            "sys",
-            "subprocess",
-            "socket",
-            "urllib",
-            "requests",
-            "http",
-            "ftplib",
-            "smtplib",
-            "imaplib",
-            "poplib",
-            "telnetlib",
-            "socketserver",
-            "threading",
-            "multiprocessing",
-            "asyncio",
-            "concurrent",
-            "ctypes",
-            "imp",
-            "importlib",
-            "__import__",
-            "exec",
-            "eval",
-            "file",
-            "open",
-            "input",
-            "raw_input",
-        }
-
-        lines = code.split("\n")
-        cleaned_lines = []
-
-        for line in lines:
-            stripped_line = line.strip()
-
-            # Check for import statements
-            if stripped_line.startswith("import ") or stripped_line.startswith("from "):
-                # Extract module name
-                if stripped_line.startswith("import "):
-                    module = stripped_line[7:].split()[0].split(".")[0]
-                elif stripped_line.startswith("from "):
-                    module = stripped_line[5:].split()[0].split(".")[0]
-                else:
-                    module = ""
-
-                # Allow safe modules, block dangerous ones
-                if module in safe_modules:
-                    cleaned_lines.append(line)  # Keep safe imports
-                elif module in dangerous_modules:
-                    continue  # Remove dangerous imports
-                else:
-                    # For unknown modules, be conservative and remove them
-                    continue
-            else:
-                cleaned_lines.append(line)
-
-        return "\n".join(cleaned_lines)
-
     def _fetch_data_from_query(self, data_query: Dict[str, Any]) -> list:
         """Fetch data from Frappe based on query parameters"""
         doctype = data_query.get("doctype")
@@ -1057,13 +1075,57 @@ Use tools API directly - no imports needed."""
 
     def _setup_execution_environment(self) -> Dict[str, Any]:
         """Legacy method - use _setup_secure_execution_environment instead"""
-        frappe.logger().warning("Using legacy _setup_execution_environment - should use secure version")
+        self._exec_logger.warning("Using legacy _setup_execution_environment - should use secure version")
         return self._setup_secure_execution_environment("legacy_user")
 
     def _setup_secure_execution_environment(self, current_user: str) -> Dict[str, Any]:
         """Setup secure execution environment with read-only database and user context"""
         from frappe_assistant_core.utils.read_only_db import ReadOnlyDatabase
 
+        # Copy the shared template; dicts and lists (built-ins, library lists) are copied
+        # too so one run cannot alter the environment of the next
+        env = {
+            name: value.copy() if isinstance(value, (dict, list)) else value
+            for name, value in self._get_base_environment().items()
+        }
+        available_libraries = env["_available_libraries"]
+        missing_libraries = env["_missing_libraries"]
+
+        # Add SECURE Frappe utilities with read-only database wrapper
+        secure_db = ReadOnlyDatabase(frappe.db)
+
+        # Add secure tool orchestration API (no internal paths exposed)
+        from frappe_assistant_core.utils.tool_api import FrappeAssistantAPI
+
+        tools_api = FrappeAssistantAPI(current_user)
+
+        env.update(
+            {
+                "db": secure_db,  # 🛡️ READ-ONLY database wrapper instead of frappe.db
+                "current_user": current_user,  # 👤 Current user context for reference
+                # 🔧 TOOL ORCHESTRATION API - secure multi-tool access
+                "tools": tools_api,  # Unified API for report/document/search operations
+            }
+        )
+
+        # Log security setup with library availability
+        self._exec_logger.info(
+            f"Secure execution environment setup complete - User: {current_user}, "
+            f"DB: Read-only wrapper, Available libraries: {', '.join(available_libraries) if available_libraries else 'None'}, "
+            f"Missing libraries: {', '.join(missing_libraries) if missing_libraries else 'None'}"
+        )
+
+        return env
+
+    @classmethod
+    def _get_base_environment(cls) -> Dict[str, Any]:
+        """
+        User-independent part of the execution environment (built-ins, libraries,
+        Frappe helpers), built once per process and copied for each run.
+        """
+        if cls._base_environment is not None:
+            return cls._base_environment
+
         # Base environment with safe built-ins only
         env = {
             "__builtins__": {
@@ -1216,13 +1278,15 @@ Use tools API directly - no imports needed."""
         except ImportError:
             missing_libraries.append("scipy")
 
-        # Add SECURE Frappe utilities with read-only database wrapper
-        secure_db = ReadOnlyDatabase(frappe.db)
-
-        # Add secure tool orchestration API (no internal paths exposed)
-        from frappe_assistant_core.utils.tool_api import FrappeAssistantAPI
+        # Add numba if available, to JIT-compile numeric loops with @njit
+        try:
+            import numba
+            from numba import njit, prange
 
-        tools_api = FrappeAssistantAPI(current_user)
+            env.update({"numba": numba, "njit": njit, "prange": prange})
+            available_libraries.append("numba (njit, prange)")
+        except ImportError:
+            missing_libraries.append("numba")
 
         env.update(
             {
@@ -1231,23 +1295,14 @@ Use tools API directly - no imports needed."""
                 "get_list": frappe.get_list,  # Permission-checked by default
                 "get_all": frappe.get_all,  # Permission-checked by default
                 "get_single": frappe.get_single,  # Permission-checked by default
-                "db": secure_db,  # 🛡️ READ-ONLY database wrapper instead of frappe.db
-                "current_user": current_user,  # 👤 Current user context for reference
-                # 🔧 TOOL ORCHESTRATION API - secure multi-tool access
-                "tools": tools_api,  # Unified API for report/document/search operations
                 # Store library availability for error messages
                 "_available_libraries": available_libraries,
                 "_missing_libraries": missing_libraries,
             }
         )
 
-        # Log security setup with library availability
-        frappe.logger().info(
-            f"Secure execution environment setup complete - User: {current_user}, "
-            f"DB: Read-only wrapper, Available libraries: {', '.join(available_libraries) if available_libraries else 'None'}, "
-            f"Missing libraries: {', '.join(missing_libraries) if missing_libraries else 'None'}"
-        )
-
+        cls._hidden_names = _EXCLUDED_VARS.union(env["__builtins__"])
+        cls._base_environment = env
         return env
 
     def _scan_for_dangerous_operations(self, code: str) -> Dict[str, Any]:
@@ -1266,78 +1321,30 @@ Use tools API directly - no imports needed."""
         Returns:
             dict: Security scan results with success flag and error details
         """
-        import re
-
-        # Define dangerous patterns with descriptions
-        dangerous_patterns = [
-            # Database security patterns
-            (
-                r'db\.sql\s*\(\s*[\'"](?:DELETE|DROP|INSERT|UPDATE|ALTER|CREATE|TRUNCATE|REPLACE)',
-                "Dangerous SQL operation detected in db.sql()",
-            ),
-            (
-                r'frappe\.db\.sql\s*\(\s*[\'"](?:DELETE|DROP|INSERT|UPDATE|ALTER|CREATE|TRUNCATE|REPLACE)',
-                "Dangerous SQL operation detected in frappe.db.sql()",
-            ),
-            # Python security patterns
-            (r"\bexec\s*\(", "Code execution via exec() not allowed"),
-            (r"\beval\s*\(", "Code evaluation via eval() not allowed"),
-            (r"__import__\s*\(", "Dynamic imports via __import__() not allowed"),
-            (r"compile\s*\(", "Code compilation not allowed"),
-            # Frappe framework modification patterns
-            (r"setattr\s*\(\s*frappe", "Frappe framework modification not allowed"),
-            (r"delattr\s*\(\s*frappe", "Frappe framework modification not allowed"),
-            (r"frappe\.local\s*\.\s*\w+\s*=", "Frappe local context modification not allowed"),
-            (r"frappe\.session\s*\.\s*\w+\s*=", "Frappe session modification not allowed"),
-            # File system access patterns (additional security)
-            (r"open\s*\(", "File system access not allowed"),
-            (r"file\s*\(", "File system access not allowed"),
-            (r"input\s*\(", "User input not allowed in code execution"),
-            (r"raw_input\s*\(", "User input not allowed in code execution"),
-            # Dangerous database method patterns
-            (r"db\.set_value\s*\(", "Database write operation db.set_value() not allowed"),
-            (r"db\.delete\s*\(", "Database delete operation not allowed"),
-            (r"db\.insert\s*\(", "Database insert operation not allowed"),
-            (r"db\.truncate\s*\(", "Database truncate operation not allowed"),
-            # Network access patterns
-            (r"urllib", "Network access not allowed"),
-            (r"requests", "Network access not allowed"),
-            (r"socket", "Network access not allowed"),
-            (r"http", "Network access not allowed"),
-        ]
-
-        # Scan for dangerous patterns
-        for pattern, message in dangerous_patterns:
-            if re.search(pattern, code, re.IGNORECASE | re.MULTILINE):
-                return {
-                    "success": False,
-                    "error": f"🚫 Security: {message}",
-                    "pattern_matched": pattern,
-                    "security_violation": True,
-                    "output": "",
-                    "variables": {},
-                }
+        # Scan for dangerous patterns in one pass; on a hit, report the first pattern in list order
+        if _DANGEROUS_UNION.search(code):
+            for pattern, message in _DANGEROUS_PATTERNS:
+                if pattern.search(code):
+                    return {
+                        "success": False,
+                        "error": f"🚫 Security: {message}",
+                        "pattern_matched": pattern.pattern,
+                        "security_violation": True,
+                        "output": "",
+                        "variables": {},
+                    }
 
         # Check for suspicious variable names that might indicate attempts to bypass security
-        suspicious_vars = [
-            r"\b_[a-zA-Z0-9_]*db[a-zA-Z0-9_]*\b",  # Variables like _db, _original_db
-            r"\boriginal_[a-zA-Z0-9_]*\b",  # Variables like original_frappe
-            r"\b__[a-zA-Z0-9_]+__\b",  # Dunder variables
-        ]
-
-        for pattern in suspicious_vars:
-            if re.search(pattern, code, re.IGNORECASE):
-                frappe.logger().warning(f"Suspicious variable pattern detected in code execution: {pattern}")
+        for pattern in _SUSPICIOUS_VAR_PATTERNS:
+            if pattern.search(code):
+                self._exec_logger.warning(
+                    f"Suspicious variable pattern detected in code execution: {pattern.pattern}"
+                )
 
         # Additional check for SQL injection patterns in string literals
-        sql_injection_patterns = [
-            r'[\'"].*(?:union|select|insert|delete|update|drop).*[\'"]',
-            r'[\'"].*;.*[\'"]',  # SQL statement terminators
-        ]
-
-        for pattern in sql_injection_patterns:
-            if re.search(pattern, code, re.IGNORECASE):
-                frappe.logger().warning(f"Potential SQL injection pattern detected: {pattern}")
+        for pattern in _SQL_INJECTION_PATTERNS:
+            if pattern.search(code):
+                self._exec_logger.warning(f"Potential SQL injection pattern detected: {pattern.pattern}")
 
         return {"success": True}
 
@@ -1354,56 +1361,29 @@ Use tools API directly - no imports needed."""
         Returns:
             dict: Sanitization results with success flag and cleaned code
         """
-        try:
-            # Check for surrogate characters (Unicode code points 0xD800-0xDFFF)
-            surrogate_found = False
-            surrogate_count = 0
-            cleaned_chars = []
-
-            for i, char in enumerate(code):
-                char_code = ord(char)
-
-                # Check if this is a surrogate character
-                if 0xD800 <= char_code <= 0xDFFF:
-                    surrogate_found = True
-                    surrogate_count += 1
-                    # Replace with space to maintain code structure
-                    cleaned_chars.append(" ")
-                    frappe.logger().warning(
-                        f"Surrogate character U+{char_code:04X} found at position {i}, replaced with space"
-                    )
-                else:
-                    cleaned_chars.append(char)
-
-            cleaned_code = "".join(cleaned_chars)
-
-            # Test if the cleaned code is valid UTF-8
-            try:
-                cleaned_code.encode("utf-8")
-            except UnicodeEncodeError as e:
-                frappe.logger().error(f"Unicode encoding still failed after cleaning: {str(e)}")
-                return {
-                    "success": False,
-                    "error": "🚫 Unicode Error: Code contains characters that cannot be encoded in UTF-8. "
-                    "Please remove or replace non-standard Unicode characters.",
-                    "output": "",
-                    "variables": {},
-                    "unicode_error": True,
-                }
-
-            result = {"success": True, "code": cleaned_code}
+        # Surrogates are the only characters UTF-8 cannot encode, so code without any
+        # (pure ASCII being the usual case) is returned unchanged
+        if code.isascii() or not _SURROGATE_RE.search(code):
+            return {"success": True, "code": code}
 
-            # Add warning information if surrogates were found
-            if surrogate_found:
-                result["warning"] = f"Cleaned {surrogate_count} surrogate character(s) from code"
-                frappe.logger().warning(
-                    f"Unicode sanitization: {surrogate_count} surrogate characters cleaned"
-                )
+        try:
+            # Replace surrogates (Unicode code points 0xD800-0xDFFF) with spaces to maintain
+            # code structure; the cleaned code then always encodes, so it is not re-checked
+            positions = [match.start() for match in _SURROGATE_RE.finditer(code)]
+            cleaned_code = code.translate(_SURROGATE_TABLE)
+            self._exec_logger.warning(
+                f"Unicode sanitization: {len(positions)} surrogate character(s) at positions "
+                f"{positions[:20]} replaced with spaces"
+            )
 
-            return result
+            return {
+                "success": True,
+                "code": cleaned_code,
+                "warning": f"Cleaned {len(positions)} surrogate character(s) from code",
+            }
 
         except Exception as e:
-            frappe.logger().error(f"Unicode sanitization failed: {str(e)}")
+            self._exec_logger.error(f"Unicode sanitization failed: {str(e)}")
             return {
                 "success": False,
                 "error": f"🚫 Unicode Processing Error: {str(e)}",
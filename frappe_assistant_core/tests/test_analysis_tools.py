@@ -119,6 +119,52 @@ class TestAnalysisTools(BaseAssistantTest):
     def test_query_and_analyze_security_restrictions(self):
         self.skipTest("Query security test placeholder")
 
+    def test_time_limit_not_swallowed_by_except_exception(self):
+        """Test the timeout still fires inside code that catches Exception"""
+        import time
+
+        from frappe_assistant_core.plugins.data_science.tools.run_python_code import (
+            _ExecutionTimeout,
+            _time_limit,
+        )
+
+        started = time.monotonic()
+        with self.assertRaises(_ExecutionTimeout):
+            with _time_limit(1):
+                while True:
+                    try:
+                        time.sleep(1)
+                    except Exception:
+                        pass
+        self.assertLess(time.monotonic() - started, 5)
+
+    def test_execute_python_code_timeout(self):
+        """Test run_python_code reports a timeout for a loop that swallows exceptions"""
+        from frappe_assistant_core.plugins.data_science.tools.run_python_code import ExecutePythonCode
+
+        code = "while True:\n    try:\n        time.sleep(1)\n    except Exception:\n        pass"
+        result = ExecutePythonCode().execute({"code": code, "timeout": 1})
+
+        self.assertFalse(result["success"])
+        self.assertTrue(result.get("timeout"))
+        self.assertIn("TimeoutError", result["error"])
+
+    def test_output_capture_is_capped(self):
+        """Test captured output stops growing at the cap and reports what was dropped"""
+        from frappe_assistant_core.plugins.data_science.tools.run_python_code import (
+            _MAX_CAPTURED_CHARS,
+            _OutputCapture,
+        )
+
+        capture = _OutputCapture()
+        capture.write("a" * (_MAX_CAPTURED_CHARS - 10))
+        self.assertEqual(capture.write("b" * 30), 30)
+        capture.write("c" * 5)
+
+        value = capture.getvalue()
+        self.assertTrue(value.startswith("a" * (_MAX_CAPTURED_CHARS - 10) + "b" * 10))
+        self.assertTrue(value.endswith("\n... [25 chars truncated]"))
+
 
 class TestAnalysisToolsIntegration(BaseAssistantTest):
     """Integration tests for analysis tools"""
@@ -0,0 +1,183 @@
+# Frappe Assistant Core - AI Assistant integration for Frappe Framework
+# Copyright (C) 2025 Paul Clinton
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Test suite for Email Tools
+Tests recipient resolution caches and draft delivery
+"""
+
+from unittest.mock import patch
+
+import frappe
+
+from frappe_assistant_core.plugins.core.tools import send_email
+from frappe_assistant_core.plugins.core.tools.send_email import RecipientEntry, RecipientIndex, SendEmail
+from frappe_assistant_core.tests.base_test import BaseAssistantTest
+
+
+class TestEmailTools(BaseAssistantTest):
+    """Test send_email recipient lookups and their invalidation"""
+
+    def setUp(self):
+        super().setUp()
+        self.tool = SendEmail()
+        self._reset_recipient_caches()
+
+    def tearDown(self):
+        frappe.db.rollback()
+        self._reset_recipient_caches()
+        super().tearDown()
+
+    def _reset_recipient_caches(self):
+        """Forget the request memo, this worker's directory and all cached misses"""
+        frappe.local._fac_recipients = None
+        send_email.clear_recipient_directory()
+
+    def _new_request(self):
+        """Start a fresh request memo, keeping the worker and shared caches"""
+        frappe.local._fac_recipients = None
+
+    def test_new_contact_found_after_cached_miss(self):
+        """Test a Contact created after a cached miss is found straight away"""
+        recipient = "Zephyrine Testcontact"
+
+        self.assertIsNone(self.tool._find_recipient(recipient))
+
+        # The miss is now answered from the shared cache
+        self._new_request()
+        self.assertIsNone(self.tool._find_recipient(recipient))
+
+        # Contact on_update starts a new recipient generation
+        frappe.get_doc(
+            {
+                "doctype": "Contact",
+                "first_name": "Zephyrine",
+                "last_name": "Testcontact",
+                "email_ids": [{"email_id": "zephyrine.testcontact@example.com", "is_primary": 1}],
+            }
+        ).insert(ignore_permissions=True)
+
+        self._new_request()
+        self.assertEqual(self.tool._find_recipient(recipient), "zephyrine.testcontact@example.com")
+
+    def test_directory_reloaded_on_new_generation(self):
+        """Test another worker's User or Contact change invalidates this worker's directory"""
+        directory = send_email.get_recipient_directory()
+        self.assertIs(send_email.get_recipient_directory(), directory)
+
+        # Simulate the doc event running in another worker: only the shared generation changes
+        frappe.cache.set_value(send_email._MISS_GEN_KEY, frappe.generate_hash(length=10))
+        self.assertIsNot(send_email.get_recipient_directory(), directory)
+
+    def test_recipient_index_search(self):
+        """Test indexed lookups keep substring matches and fold case and accents"""
+        index = RecipientIndex(
+            [
+                RecipientEntry(name, email, send_email._search_fields(name, email))
+                for name, email in (
+                    ("Martin Leroy", "martin.leroy@example.com"),
+                    ("Paul Martin", "paul.martin@example.com"),
+                    ("Jérémy Blanc", "jeremy.blanc@example.com"),
+                )
+            ]
+        )
+
+        # A prefix hit does not hide another person with the name inside theirs
+        self.assertEqual(
+            [entry.display_name for entry in index.search("martin", limit=5)],
+            ["Martin Leroy", "Paul Martin"],
+        )
+        self.assertEqual(
+            [entry.display_name for entry in index.search(send_email._fold("Jeremy"), limit=5)],
+            ["Jérémy Blanc"],
+        )
+        self.assertEqual(len(index.search("martin", limit=1)), 1)
+        self.assertEqual(index.search("nobody", limit=5), [])
+
+
+class TestEmailDrafts(BaseAssistantTest):
+    """Test send_email draft reuse and background delivery"""
+
+    def setUp(self):
+        super().setUp()
+        self.tool = SendEmail()
+        self.arguments = {
+            "recipient": "draft.recipient@example.com",
+            "subject": "TEST draft cache",
+            "message": "TEST message body",
+        }
+        frappe.cache.delete_value(self.tool._draft_cache_key(self.arguments))
+
+    def tearDown(self):
+        frappe.cache.delete_value(self.tool._draft_cache_key(self.arguments))
+        frappe.db.rollback()
+        super().tearDown()
+
+    def test_repeated_draft_request_reuses_draft(self):
+        """Test an identical draft request returns the existing draft until it is sent"""
+        first = self.tool.execute(self.arguments)
+        self.assertTrue(first["success"])
+
+        second = self.tool.execute(self.arguments)
+        self.assertEqual(second["communication_id"], first["communication_id"])
+
+        # A sent draft is never handed out again
+        frappe.db.set_value("Communication", first["communication_id"], "email_status", "Sent")
+        third = self.tool.execute(self.arguments)
+        self.assertNotEqual(third["communication_id"], first["communication_id"])
+
+    def test_modified_draft_not_reused(self):
+        """Test a draft edited since it was cached is not returned for a new request"""
+        first = self.tool.execute(self.arguments)
+
+        frappe.db.set_value("Communication", first["communication_id"], "subject", "TEST edited subject")
+        second = self.tool.execute(self.arguments)
+        self.assertNotEqual(second["communication_id"], first["communication_id"])
+
+    def test_deliver_communication_marks_sent(self):
+        """Test the delivery job marks confirmed drafts as sent"""
+        draft = self.tool.execute(self.arguments)
+
+        with patch.object(frappe, "sendmail") as sendmail:
+            send_email.deliver_communication(draft["communication_id"], mark_sent=True)
+
+        sendmail.assert_called_once()
+        status = frappe.db.get_value(
+            "Communication", draft["communication_id"], ["email_status", "delivery_status"], as_dict=True
+        )
+        self.assertEqual(status.email_status, "Sent")
+        self.assertEqual(status.delivery_status, "Sent")
+
+        # A second run of the same job does not send the email again
+        with patch.object(frappe, "sendmail") as sendmail:
+            send_email.deliver_communication(draft["communication_id"], mark_sent=True)
+        sendmail.assert_not_called()
+
+    def test_deliver_communication_records_failure(self):
+        """Test a failed send is recorded on the Communication instead of being lost in the worker"""
+        draft = self.tool.execute(self.arguments)
+        frappe.db.commit()
+
+        try:
+            with patch.object(frappe, "sendmail", side_effect=Exception("TEST SMTP failure")):
+                send_email.deliver_communication(draft["communication_id"], mark_sent=True)
+
+            self.assertEqual(
+                frappe.db.get_value("Communication", draft["communication_id"], "delivery_status"), "Error"
+            )
+        finally:
+            frappe.delete_doc("Communication", draft["communication_id"], ignore_permissions=True, force=True)
+            frappe.db.commit()
@@ -132,6 +132,169 @@ class TestReportTools(BaseAssistantTest):
         """Test report format functionality"""
         self.skipTest("Report format test placeholder")
 
+    def test_canonicalize_filters(self):
+        """Test filters are normalized in a single pass"""
+        import datetime
+
+        from frappe_assistant_core.plugins.core.tools.report_tools import ReportTools
+
+        canonical = ReportTools._canonicalize_filters(
+            {
+                "company": "Test Company",
+                "from_date": datetime.date(2024, 1, 31),
+                "customer": None,
+                "warehouse": ["Stores", None],
+                "limit": 10,
+            }
+        )
+
+        self.assertEqual(
+            canonical,
+            {
+                "company": "Test Company",
+                "from_date": "2024-01-31",
+                "warehouse": ["Stores"],
+                "limit": 10,
+            },
+        )
+        self.assertEqual(ReportTools._canonicalize_filters(None), {})
+
+    def test_latest_fiscal_year_cache(self):
+        """Test the fiscal year is cached until a Fiscal Year changes, and misses are not cached"""
+        from unittest.mock import patch
+
+        from frappe_assistant_core.plugins.core.tools import report_tools
+        from frappe_assistant_core.plugins.core.tools.report_tools import ReportTools
+
+        def lookup():
+            # Start a fresh request memo so each call reaches the shared cache
+            frappe.local._fac_latest_fiscal_year = report_tools._SENTINEL
+            return ReportTools._get_latest_fiscal_year()
+
+        report_tools.clear_fiscal_year_cache()
+        try:
+            with patch.object(frappe.db, "get_value", return_value=None) as get_value:
+                self.assertIsNone(lookup())
+                self.assertIsNone(lookup())
+                self.assertEqual(get_value.call_count, 2)
+
+            with patch.object(frappe.db, "get_value", return_value=("2024-01-01", "2024-12-31")) as get_value:
+                self.assertEqual(lookup(), ("2024-01-01", "2024-12-31"))
+                self.assertEqual(lookup(), ("2024-01-01", "2024-12-31"))
+                self.assertEqual(get_value.call_count, 1)
+
+                # Fiscal Year on_update/on_trash clears the cached value
+                report_tools.clear_fiscal_year_cache()
+                lookup()
+                self.assertEqual(get_value.call_count, 2)
+        finally:
+            report_tools.clear_fiscal_year_cache()
+            frappe.local._fac_latest_fiscal_year = report_tools._SENTINEL
+
+    def _cached_report_doc(self, result_cache_ttl):
+        """A Query Report document stand-in with the given result_cache_ttl"""
+        return frappe._dict(
+            name="TEST Cached Report",
+            report_type="Query Report",
+            module="Core",
+            prepared_report=0,
+            result_cache_ttl=result_cache_ttl,
+        )
+
+    def _run_cached_report(self, report_doc, handler, filters):
+        """Run execute_report against a stubbed report document and execution handler"""
+        from unittest.mock import patch
+
+        from frappe_assistant_core.plugins.core.tools.report_tools import ReportTools
+
+        with patch.object(frappe, "get_cached_doc", return_value=report_doc), patch.object(
+            frappe, "has_permission", return_value=True
+        ), patch.dict(ReportTools._EXEC_DISPATCH, {"Query Report": handler}):
+            return ReportTools.execute_report(report_doc.name, filters)
+
+    def test_execute_report_result_cache(self):
+        """Test results are cached per filters only for reports with result_cache_ttl set"""
+        from unittest.mock import MagicMock
+
+        from frappe_assistant_core.plugins.core.tools.report_tools import ReportTools
+
+        handler = MagicMock(return_value={"result": [{"value": 1}], "columns": []})
+        filters = {"test_filter": "A", "from_date": "2024-01-01", "to_date": "2024-12-31"}
+        cache_key = ReportTools._get_result_cache_key("TEST Cached Report", filters)
+        frappe.cache.delete_value(cache_key)
+
+        try:
+            # Opted in: the second identical call is served from the cache
+            report_doc = self._cached_report_doc(result_cache_ttl=60)
+            first = self._run_cached_report(report_doc, handler, filters)
+            second = self._run_cached_report(report_doc, handler, filters)
+            self.assertTrue(first["success"])
+            self.assertEqual(first["data"], second["data"])
+            self.assertEqual(handler.call_count, 1)
+
+            # Other filters are a different cache entry
+            self._run_cached_report(report_doc, handler, {**filters, "test_filter": "B"})
+            self.assertEqual(handler.call_count, 2)
+
+            # Not opted in: every call executes the report
+            frappe.cache.delete_value(cache_key)
+            report_doc = self._cached_report_doc(result_cache_ttl=0)
+            self._run_cached_report(report_doc, handler, filters)
+            self._run_cached_report(report_doc, handler, filters)
+            self.assertEqual(handler.call_count, 4)
+            self.assertIsNone(frappe.cache.get_value(cache_key))
+        finally:
+            frappe.cache.delete_value(cache_key)
+            frappe.cache.delete_value(
+                ReportTools._get_result_cache_key("TEST Cached Report", {**filters, "test_filter": "B"})
+            )
+
+    def test_execute_report_errors_not_cached(self):
+        """Test failed report results are not served from the result cache"""
+        from unittest.mock import MagicMock
+
+        from frappe_assistant_core.plugins.core.tools.report_tools import ReportTools
+
+        handler = MagicMock(return_value={"result": [], "columns": [], "error": "TEST failure"})
+        filters = {"test_filter": "A", "from_date": "2024-01-01", "to_date": "2024-12-31"}
+        cache_key = ReportTools._get_result_cache_key("TEST Cached Report", filters)
+        frappe.cache.delete_value(cache_key)
+
+        try:
+            report_doc = self._cached_report_doc(result_cache_ttl=60)
+            self._run_cached_report(report_doc, handler, filters)
+            self._run_cached_report(report_doc, handler, filters)
+            self.assertEqual(handler.call_count, 2)
+        finally:
+            frappe.cache.delete_value(cache_key)
+
+    def test_prepared_report_wait_wakes_on_signal(self):
+        """Test waiting on a prepared report returns as soon as completion is signalled"""
+        import time
+
+        from frappe_assistant_core.plugins.core.tools.report_tools import (
+            ReportTools,
+            get_prepared_report_signal_key,
+            notify_prepared_report_status,
+        )
+
+        name = "TEST-PREPARED-REPORT"
+        frappe.cache.delete_value(get_prepared_report_signal_key(name))
+
+        # Unfinished reports push no signal; the wait runs until its timeout
+        notify_prepared_report_status(frappe._dict(name=name, status="Started"))
+        frappe.db.commit()
+        started = time.monotonic()
+        ReportTools._wait_for_prepared_report(name, timeout=1)
+        self.assertGreaterEqual(time.monotonic() - started, 0.9)
+
+        # Completion is pushed after commit and wakes the waiter immediately
+        notify_prepared_report_status(frappe._dict(name=name, status="Completed"))
+        frappe.db.commit()
+        started = time.monotonic()
+        ReportTools._wait_for_prepared_report(name, timeout=10)
+        self.assertLess(time.monotonic() - started, 5)
+
 
 class TestReportToolsIntegration(BaseAssistantTest):
     """Integration tests for report tools"""